@@ -1,11 +1,17 @@
-from jarvis.core.orchestrator import Orchestrator
+import sys
 
 def main():
     """
     启动 Jarvis 语音助手（CLI 版本）
+    `jarvis transcribe ...` 进入离线批量转写
     """
+    if len(sys.argv) > 1 and sys.argv[1] == 'transcribe':
+        from transcribe import main as transcribe_main
+        transcribe_main(sys.argv[2:])
+        return
+    from jarvis.core.orchestrator import Orchestrator
     orchestrator = Orchestrator()
     orchestrator.run()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
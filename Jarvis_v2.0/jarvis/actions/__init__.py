@@ -1,19 +1,104 @@
 from typing import Dict, Any
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, TimeoutError
+import inspect
+import threading
+import time
 from jarvis.tools import registry
+from jarvis.core.aio import background_loop
+
+# 同步工具的执行线程池，协程工具在后台事件循环中执行
+_POOL_SIZE = 4
+_executor = ThreadPoolExecutor(_POOL_SIZE, 'jarvis-tool')
+
+class ToolCall:
+    """
+    submit 返回的句柄：工具名、底层 Future 及自提交起计的截止时间。
+    """
+    def __init__(self, name: str, future: Future, timeout: float):
+        self.name = name
+        self.future = future
+        self.timeout = timeout
+        self.started_at = time.monotonic()
+
+    @property
+    def deadline(self) -> float:
+        return self.started_at + self.timeout
 
 class ActionTrigger:
-    def __init__(self, tool_registry=registry):
+    """
+    工具调用：协程工具超时后取消；同步工具在线程池中执行，一旦开始运行便无法中断，
+    超时只是不再等待其结果，因此同步工具应自行限制耗时（如 HTTP 客户端的超时）。
+    仍在排队的同步调用超时后直接丢弃，不再占用线程。
+    """
+    def __init__(self, tool_registry=registry, executor: ThreadPoolExecutor = _executor, default_timeout: float = 15.0):
         self.tool_registry = tool_registry
+        self.executor = executor
+        self.default_timeout = default_timeout
+        self._pool_size = executor._max_workers
+        # 已提交且未结束的同步调用数，超过线程数时后续调用需要排队
+        self._in_flight = 0
+        self._lock = threading.Lock()
 
     def trigger(self, intent_name: str, params: Dict[str, Any]) -> Any:
         tool = self.tool_registry.get(intent_name)
         if tool:
             try:
+                if inspect.iscoroutinefunction(tool.func):
+                    return self.result(self.submit(intent_name, params))
                 return tool.call(**params)
             except Exception as e:
                 return f"工具调用失败: {e}"
         else:
             return f"未找到对应工具：{intent_name}"
 
+    def _timeout(self, tool) -> float:
+        return tool.timeout if tool.timeout is not None else self.default_timeout
+
+    async def _acall(self, tool, params: Dict[str, Any]) -> Any:
+        try:
+            return await tool.call(**params)
+        except Exception as e:
+            return f"工具调用失败: {e}"
+
+    def _run(self, intent_name: str, params: Dict[str, Any], deadline: float) -> Any:
+        # 排队期间已超时的调用不再执行，结果也不会有人等待
+        if time.monotonic() >= deadline:
+            return f"工具调用超时：{intent_name}"
+        return self.trigger(intent_name, params)
+
+    def _finished(self, future: Future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def submit(self, intent_name: str, params: Dict[str, Any]) -> ToolCall:
+        """
+        异步执行工具，立即返回 ToolCall；LLM 流式输出中每个工具调用一完整即可提交。
+        """
+        tool = self.tool_registry.get(intent_name)
+        timeout = self._timeout(tool) if tool else self.default_timeout
+        if tool and inspect.iscoroutinefunction(tool.func):
+            return ToolCall(intent_name, background_loop.submit(self._acall(tool, params)), timeout)
+        with self._lock:
+            self._in_flight += 1
+            in_flight = self._in_flight
+        if in_flight > self._pool_size:
+            print(f"工具线程池已满（{in_flight - 1} 个调用未结束），{intent_name} 需排队等待")
+        future = self.executor.submit(self._run, intent_name, params, time.monotonic() + timeout)
+        future.add_done_callback(self._finished)
+        return ToolCall(intent_name, future, timeout)
+
+    def result(self, call: ToolCall) -> Any:
+        """
+        等待 submit 返回的调用结果，超过该工具的超时时间（自提交起计）则取消并返回超时提示。
+        """
+        try:
+            return call.future.result(max(0.0, call.deadline - time.monotonic()))
+        except TimeoutError:
+            if not call.future.cancel() and call.future.running():
+                print(f"工具 {call.name} 已超时但无法中断，仍占用一个工具线程")
+            return f"工具调用超时：{call.name}"
+        except CancelledError:
+            return f"工具调用已取消：{call.name}"
+
 # 全局 ActionTrigger 实例
-trigger = ActionTrigger() 
\ No newline at end of file
+trigger = ActionTrigger()
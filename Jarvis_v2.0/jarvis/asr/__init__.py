@@ -1,113 +1,337 @@
-from typing import Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import asyncio
+import base64
 import importlib
+import threading
 import speech_recognition as sr
 import os, time
+import tempfile
+import wave
 import numpy as np
 from pathlib import Path
+from jarvis.audio.capture import MicrophoneCapture
+from .noise import NoiseFloorEstimator
+from .vad import VADEndpointer
+
+# 本地解码与录音在线程池中执行，避免阻塞事件循环
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='jarvis-asr')
 
 class ASREngine:
+    sample_rate = 16000
+    # 共享麦克风采集服务，未设置时每次识别单独打开麦克风
+    capture: Optional[MicrophoneCapture] = None
+    # 后台噪声基底估计，设置后无需每次识别前做环境噪声校准
+    noise_floor: Optional[NoiseFloorEstimator] = None
+    # 端点检测组件，可按实例替换为不同参数
+    vad: VADEndpointer = VADEndpointer()
+
     def recognize(self, keep_audio_file: bool = False, timeout: int = 60) -> Optional[str]:
+        """
+        整段识别：录制一句话后在内存中解码，仅在 keep_audio_file 时落盘存档。
+        """
+        text = None
+        for text, is_final in self.recognize_stream(self.microphone_frames(timeout), keep_audio_file):
+            if is_final:
+                break
+        return text
+
+    def transcribe(self, samples: np.ndarray) -> Optional[str]:
+        """
+        对一段 16kHz 单声道 int16 PCM 进行识别。
+        """
         raise NotImplementedError
 
+    def transcribe_batch(self, batch: List[np.ndarray]) -> List[Optional[str]]:
+        """
+        批量识别，默认逐条调用 transcribe；支持批处理的引擎可覆盖。
+        """
+        return [self.transcribe(samples) for samples in batch]
+
+    def recognize_stream(self, frames: Iterable[np.ndarray], keep_audio_file: bool = False) -> Iterator[Tuple[str, bool]]:
+        """
+        流式识别：输入 int16 PCM 帧，产出 (文本, 是否最终结果)。
+        默认实现先整句收集再调用 transcribe，支持流式解码的引擎应覆盖此方法。
+        """
+        samples = np.concatenate([np.asarray(frame, dtype=np.int16) for frame in frames] or [np.zeros(0, dtype=np.int16)])
+        if keep_audio_file and samples.size:
+            save_wav(samples, self.sample_rate)
+        if samples.size:
+            yield self.transcribe(samples) or '', True
+
+    async def arecognize(self, keep_audio_file: bool = False, timeout: int = 60) -> Optional[str]:
+        return await self.arecognize_stream(self.microphone_frames(timeout), keep_audio_file)
+
+    async def arecognize_stream(self, frames: Iterable[np.ndarray], keep_audio_file: bool = False,
+                                on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        异步识别：在线程池中消费帧并解码，on_partial 接收中间结果。
+        任务被取消时停止继续读取帧。
+        """
+        stop = threading.Event()
+
+        def run():
+            text = None
+            for text, is_final in self.recognize_stream(_until(frames, stop), keep_audio_file):
+                if not is_final and on_partial:
+                    on_partial(text)
+            return text
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(_executor, run)
+        except asyncio.CancelledError:
+            stop.set()
+            raise
+
+    async def atranscribe(self, samples: np.ndarray) -> Optional[str]:
+        """
+        异步整段识别，默认放到线程池执行；云端引擎可覆盖为原生异步请求。
+        """
+        return await asyncio.get_running_loop().run_in_executor(_executor, self.transcribe, samples)
+
+    def microphone_frames(self, timeout: int = 60, preroll: float = 0.0) -> Iterator[np.ndarray]:
+        """
+        录制一句话并由 VAD 切分端点，逐帧产出 int16 PCM，最长 timeout 秒。
+        设置了共享采集服务时直接从环形缓冲区读取（可带 preroll 秒的预录音频），否则单独打开麦克风。
+        """
+        if self.capture is not None:
+            frames = self.capture.frames(start=self.capture.preroll_cursor(preroll), duration=timeout)
+            yield from self.vad.segment(frames, self.noise_floor)
+            return
+        with sr.Microphone(sample_rate=self.sample_rate) as source:
+            frame_count = int(timeout * self.sample_rate / source.CHUNK)
+            frames = (np.frombuffer(source.stream.read(source.CHUNK), dtype=np.int16) for _ in range(frame_count))
+            yield from self.vad.segment(frames, self.noise_floor)
+
+def _until(frames: Iterable[np.ndarray], stop: threading.Event) -> Iterator[np.ndarray]:
+    for frame in frames:
+        if stop.is_set():
+            return
+        yield frame
+
+def load_wav(file_name: str, sample_rate: int = 16000) -> np.ndarray:
+    """
+    读取 16bit WAV 并转换为单声道 int16，采样率不一致时线性插值重采样。
+    """
+    with wave.open(file_name) as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"仅支持 16bit WAV: {file_name}")
+        channels = f.getnchannels()
+        rate = f.getframerate()
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != sample_rate and samples.size:
+        positions = np.arange(0, samples.size, rate / sample_rate)
+        samples = np.interp(positions, np.arange(samples.size), samples).astype(np.int16)
+    return samples
+
+def save_wav(samples: np.ndarray, sample_rate: int = 16000, file_name: Optional[str] = None) -> str:
+    if file_name is None:
+        timestamp = time.strftime('%Y-%m-%d-%H_%M_%S', time.localtime(time.time()))
+        file_name = os.path.join(Path.home(), f"{timestamp}.wav")
+    with wave.open(file_name, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+    return file_name
+
 class BaiduASR(ASREngine):
+    TOKEN_URL = 'https://aip.baidubce.com/oauth/2.0/token'
+    ASR_URL = 'https://vop.baidu.com/server_api'
+
     def __init__(self, app_id, api_key, secret_key):
         aip = importlib.import_module('aip')
         self.client = aip.AipSpeech(app_id, api_key, secret_key)
-        self.recognizer = sr.Recognizer()
+        self.api_key = api_key
+        self.secret_key = secret_key
+        # 异步接口使用连接池复用的 httpx.AsyncClient，需在同一事件循环中使用
+        self._http = None
+        self._token = None
+        self._token_expires = 0.0
 
     def recognize(self, keep_audio_file: bool = False, timeout: int = 120) -> Optional[str]:
-        with sr.Microphone(sample_rate=16000) as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
-            audio = self.recognizer.listen(source, timeout=timeout)
-            timestamp = time.strftime('%Y-%m-%d-%H_%M_%S', time.localtime(time.time()))
-            file_name = os.path.join(Path.home(), f"{timestamp}.wav")
-            if keep_audio_file and audio:
-                with open(file_name, "wb") as f:
-                    f.write(audio.get_wav_data())
-            if audio:
-                audio_data = audio.get_wav_data()
-                result = self.client.asr(audio_data, 'wav', 16000, {'dev_pid': 1537})
-                if result.get('err_msg') == 'success.':
-                    return result['result'][0]
+        return super().recognize(keep_audio_file, timeout)
+
+    def transcribe(self, samples: np.ndarray) -> Optional[str]:
+        # 直接上传裸 PCM，无需封装 WAV
+        result = self.client.asr(samples.tobytes(), 'pcm', self.sample_rate, {'dev_pid': 1537})
+        if result.get('err_msg') == 'success.':
+            return result['result'][0]
+        return None
+
+    def _http_client(self):
+        if self._http is None:
+            httpx = importlib.import_module('httpx')
+            self._http = httpx.AsyncClient(timeout=10.0, limits=httpx.Limits(max_keepalive_connections=8))
+        return self._http
+
+    async def _access_token(self) -> str:
+        if self._token is None or time.time() >= self._token_expires:
+            resp = await self._http_client().post(self.TOKEN_URL, params={
+                'grant_type': 'client_credentials',
+                'client_id': self.api_key,
+                'client_secret': self.secret_key
+            })
+            payload = resp.json()
+            self._token = payload['access_token']
+            # 提前一分钟刷新
+            self._token_expires = time.time() + payload.get('expires_in', 2592000) - 60
+        return self._token
+
+    async def arecognize_stream(self, frames: Iterable[np.ndarray], keep_audio_file: bool = False,
+                                on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        # 录音在线程池中完成，识别请求走原生异步 HTTP
+        samples = await asyncio.get_running_loop().run_in_executor(
+            _executor, lambda: np.concatenate([np.asarray(f, dtype=np.int16) for f in frames] or [np.zeros(0, dtype=np.int16)]))
+        if keep_audio_file and samples.size:
+            save_wav(samples, self.sample_rate)
+        if not samples.size:
+            return None
+        return await self.atranscribe(samples)
+
+    async def atranscribe(self, samples: np.ndarray) -> Optional[str]:
+        httpx = importlib.import_module('httpx')
+        speech = samples.tobytes()
+        # 网络错误、超时及异常响应与同步接口一样视为识别失败，不向上抛出
+        try:
+            resp = await self._http_client().post(self.ASR_URL, json={
+                'format': 'pcm',
+                'rate': self.sample_rate,
+                'channel': 1,
+                'cuid': 'jarvis',
+                'token': await self._access_token(),
+                'dev_pid': 1537,
+                'speech': base64.b64encode(speech).decode('ascii'),
+                'len': len(speech)
+            })
+            result = resp.json()
+            if result.get('err_msg') == 'success.':
+                return result['result'][0]
+            print("百度语音识别失败", result)
+        except (httpx.HTTPError, KeyError, IndexError, ValueError) as e:
+            print("百度语音识别请求失败", repr(e))
         return None
 
 class PaddleSpeechASR(ASREngine):
     def __init__(self):
         paddlespeech = importlib.import_module('paddlespeech.cli.asr.infer')
         self.executor = paddlespeech.ASRExecutor()
-        self.recognizer = sr.Recognizer()
-
-    def recognize(self, keep_audio_file: bool = True, timeout: int = 60) -> Optional[str]:
-        with sr.Microphone(sample_rate=16000) as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
-            audio = self.recognizer.listen(source, timeout=timeout)
-            timestamp = time.strftime('%Y-%m-%d-%H_%M_%S', time.localtime(time.time()))
-            file_name = os.path.join(Path.home(), f"{timestamp}.wav")
-            if keep_audio_file and audio:
-                with open(file_name, "wb") as f:
-                    f.write(audio.get_wav_data())
-            if audio:
-                return self.executor(audio_file=file_name)
-        return None
+
+    def transcribe(self, samples: np.ndarray) -> Optional[str]:
+        # ASRExecutor 只接受文件路径，使用临时文件并在识别后立即删除
+        fd, file_name = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            save_wav(samples, self.sample_rate, file_name)
+            return self.executor(audio_file=file_name)
+        finally:
+            os.remove(file_name)
 
 class WhisperASR(ASREngine):
-    def __init__(self, model_name="base"):
+    def __init__(self, model_name="base", download_root: Optional[str] = None):
         whisper = importlib.import_module('whisper')
-        self.model = whisper.load_model(model_name)
-        self.recognizer = sr.Recognizer()
-
-    def recognize(self, keep_audio_file: bool = True, timeout: int = 120) -> Optional[str]:
-        with sr.Microphone(sample_rate=16000) as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
-            audio = self.recognizer.listen(source, timeout=timeout)
-            timestamp = time.strftime('%Y-%m-%d-%H_%M_%S', time.localtime(time.time()))
-            file_name = os.path.join(Path.home(), f"{timestamp}.wav")
-            if keep_audio_file and audio:
-                with open(file_name, "wb") as f:
-                    f.write(audio.get_wav_data())
-            if audio:
-                result = self.model.transcribe(file_name, fp16=False)
-                return result["text"]
-        return None
+        # download_root 指向持久化的模型缓存目录，重启时无需重新下载
+        self.model = whisper.load_model(model_name, download_root=download_root)
 
-class SherpaASR(ASREngine):
-    def __init__(self, model_path):
-        self.model_path = model_path
-        self.recognizer = sr.Recognizer()
+    def recognize(self, keep_audio_file: bool = False, timeout: int = 120) -> Optional[str]:
+        return super().recognize(keep_audio_file, timeout)
 
-    def _create_recognizer(self):
+    def transcribe(self, samples: np.ndarray) -> Optional[str]:
+        result = self.model.transcribe(samples.astype(np.float32) / 32768, fp16=False)
+        return result["text"]
+
+class SherpaModel:
+    """
+    常驻内存的 sherpa-ncnn 模型，每句话复用同一识别器并重置出新的解码流。
+    """
+    def __init__(self, model_path: str, num_threads: int = 4):
         sherpa_ncnn = importlib.import_module('sherpa_ncnn')
-        return sherpa_ncnn.Recognizer(
-            tokens=f"{self.model_path}/tokens.txt",
-            encoder_param=f"{self.model_path}/encoder_jit_trace-pnnx.ncnn.param",
-            encoder_bin=f"{self.model_path}/encoder_jit_trace-pnnx.ncnn.bin",
-            decoder_param=f"{self.model_path}/decoder_jit_trace-pnnx.ncnn.param",
-            decoder_bin=f"{self.model_path}/decoder_jit_trace-pnnx.ncnn.bin",
-            joiner_param=f"{self.model_path}/joiner_jit_trace-pnnx.ncnn.param",
-            joiner_bin=f"{self.model_path}/joiner_jit_trace-pnnx.ncnn.bin",
-            num_threads=4,
+        self.recognizer = sherpa_ncnn.Recognizer(
+            tokens=f"{model_path}/tokens.txt",
+            encoder_param=f"{model_path}/encoder_jit_trace-pnnx.ncnn.param",
+            encoder_bin=f"{model_path}/encoder_jit_trace-pnnx.ncnn.bin",
+            decoder_param=f"{model_path}/decoder_jit_trace-pnnx.ncnn.param",
+            decoder_bin=f"{model_path}/decoder_jit_trace-pnnx.ncnn.bin",
+            joiner_param=f"{model_path}/joiner_jit_trace-pnnx.ncnn.param",
+            joiner_bin=f"{model_path}/joiner_jit_trace-pnnx.ncnn.bin",
+            num_threads=num_threads,
+            enable_endpoint_detection=True,
+            rule1_min_trailing_silence=2.4,
+            rule2_min_trailing_silence=1.2,
+            rule3_min_utterance_length=300,
         )
+        self.sample_rate = self.recognizer.sample_rate
+        self._lock = threading.Lock()
+
+    def warmup(self, duration: float = 1.0):
+        # 用一段静音跑一遍完整解码，提前完成内存分配
+        with self.stream() as recognizer:
+            recognizer.accept_waveform(self.sample_rate, np.zeros(int(self.sample_rate * duration), dtype=np.float32))
+            recognizer.input_finished()
+            recognizer.text
+
+    @contextmanager
+    def stream(self):
+        """
+        独占识别器并提供一条全新的解码流，退出时重置状态。
+        """
+        with self._lock:
+            self.recognizer.reset()
+            try:
+                yield self.recognizer
+            finally:
+                self.recognizer.reset()
+
+_sherpa_models: Dict[Tuple[str, int], SherpaModel] = {}
+_sherpa_models_lock = threading.Lock()
+
+def load_sherpa_model(model_path: str, num_threads: int = 4, warmup: bool = False) -> SherpaModel:
+    """
+    进程级缓存：相同模型路径与线程数只加载一次。
+    """
+    key = (model_path, num_threads)
+    with _sherpa_models_lock:
+        model = _sherpa_models.get(key)
+        if model is None:
+            model = SherpaModel(model_path, num_threads)
+            if warmup:
+                model.warmup()
+            _sherpa_models[key] = model
+    return model
+
+class SherpaASR(ASREngine):
+    def __init__(self, model_path, num_threads: int = 4, warmup: bool = False):
+        self.model_path = model_path
+        self.model = load_sherpa_model(model_path, num_threads, warmup)
+
+    def transcribe(self, samples: np.ndarray) -> Optional[str]:
+        with self.model.stream() as sherpa_recognizer:
+            sherpa_recognizer.accept_waveform(sherpa_recognizer.sample_rate, samples.astype(np.float32) / 32768)
+            tail_paddings = np.zeros(int(sherpa_recognizer.sample_rate * 0.5), dtype=np.float32)
+            sherpa_recognizer.accept_waveform(sherpa_recognizer.sample_rate, tail_paddings)
+            sherpa_recognizer.input_finished()
+            return sherpa_recognizer.text
 
-    def recognize(self, keep_audio_file: bool = True, timeout: int = 60) -> Optional[str]:
-        with sr.Microphone(sample_rate=16000) as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
-            audio = self.recognizer.listen(source, timeout=timeout)
-            timestamp = time.strftime('%Y-%m-%d-%H_%M_%S', time.localtime(time.time()))
-            file_name = os.path.join(Path.home(), f"{timestamp}.wav")
-            if keep_audio_file and audio:
-                with open(file_name, "wb") as f:
-                    f.write(audio.get_wav_data())
-            if audio:
-                sherpa_recognizer = self._create_recognizer()
-                import wave
-                with wave.open(file_name) as f:
-                    num_samples = f.getnframes()
-                    samples = f.readframes(num_samples)
-                    samples_int16 = np.frombuffer(samples, dtype=np.int16)
-                    samples_float32 = samples_int16.astype(np.float32) / 32768
-                    sherpa_recognizer.accept_waveform(sherpa_recognizer.sample_rate, samples_float32)
-                    tail_paddings = np.zeros(int(sherpa_recognizer.sample_rate * 0.5), dtype=np.float32)
-                    sherpa_recognizer.accept_waveform(sherpa_recognizer.sample_rate, tail_paddings)
-                    sherpa_recognizer.input_finished()
-                    return sherpa_recognizer.text
-        return None 
\ No newline at end of file
+    def recognize_stream(self, frames: Iterable[np.ndarray], keep_audio_file: bool = False) -> Iterator[Tuple[str, bool]]:
+        recorded = []
+        text = ''
+        with self.model.stream() as sherpa_recognizer:
+            for frame in frames:
+                if keep_audio_file:
+                    recorded.append(frame)
+                sherpa_recognizer.accept_waveform(sherpa_recognizer.sample_rate, frame.astype(np.float32) / 32768)
+                if sherpa_recognizer.text != text:
+                    text = sherpa_recognizer.text
+                    yield text, False
+                if text and sherpa_recognizer.is_endpoint:
+                    break
+            tail_paddings = np.zeros(int(sherpa_recognizer.sample_rate * 0.5), dtype=np.float32)
+            sherpa_recognizer.accept_waveform(sherpa_recognizer.sample_rate, tail_paddings)
+            sherpa_recognizer.input_finished()
+            text = sherpa_recognizer.text
+        if keep_audio_file and recorded:
+            save_wav(np.concatenate(recorded), self.sample_rate)
+        yield text, True
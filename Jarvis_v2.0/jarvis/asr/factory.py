@@ -0,0 +1,25 @@
+from jarvis.config.settings import settings
+from . import ASREngine, BaiduASR, PaddleSpeechASR, WhisperASR, SherpaASR
+from .hedged import HedgedASR
+
+def create_asr_engine(name: str) -> ASREngine:
+    """
+    按名称创建 ASR 引擎，未知名称时使用 Whisper。
+    """
+    if name == 'baidu':
+        return BaiduASR(settings.BAIDU_APP_ID, settings.BAIDU_API_KEY, settings.BAIDU_SECRET_KEY)
+    elif name == 'paddlespeech':
+        return PaddleSpeechASR()
+    elif name == 'whisper':
+        return WhisperASR(download_root=settings.MODEL_CACHE_DIR)
+    elif name == 'sherpa':
+        return SherpaASR(settings.SHERPA_MODEL_PATH, settings.SHERPA_NUM_THREADS, settings.SHERPA_WARMUP)
+    elif name == 'hedged':
+        # 云端百度与本地 Sherpa 并行识别，优先采用更准确的百度结果；
+        # Sherpa 先返回时最多再等 ASR_HEDGE_PREFER_WINDOW 秒
+        return HedgedASR([
+            BaiduASR(settings.BAIDU_APP_ID, settings.BAIDU_API_KEY, settings.BAIDU_SECRET_KEY),
+            SherpaASR(settings.SHERPA_MODEL_PATH, settings.SHERPA_NUM_THREADS, settings.SHERPA_WARMUP)
+        ], prefer_window=settings.ASR_HEDGE_PREFER_WINDOW)
+    else:
+        return WhisperASR(download_root=settings.MODEL_CACHE_DIR)
@@ -0,0 +1,146 @@
+import asyncio
+import functools
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from jarvis.core.aio import background_loop
+from . import ASREngine, _executor, save_wav
+
+_END = object()
+
+class HedgedASR(ASREngine):
+    """
+    对冲识别：同一段音频同时送入多个引擎（如云端百度与本地 Sherpa），engines 按偏好顺序排列。
+    偏好较低的引擎先给出可信结果时，最多再等 prefer_window 秒看更偏好的引擎能否返回；
+    未被采用的引擎在后台继续运行至多 measure_timeout 秒后取消，以便统计各引擎的真实延迟。
+    """
+    def __init__(self, engines: List[ASREngine], is_confident: Optional[Callable[[Optional[str]], bool]] = None,
+                 prefer_window: float = 0.3, measure_timeout: float = 5.0):
+        self.engines = engines
+        self.is_confident = is_confident or (lambda text: bool(text and text.strip()))
+        self.prefer_window = prefer_window
+        self.measure_timeout = measure_timeout
+        # 按实例统计，同类引擎出现多次时以序号区分
+        classes = [type(engine).__name__ for engine in engines]
+        self._names = [name if classes.count(name) == 1 else f'{name}#{index}' for index, name in enumerate(classes)]
+        self._stats: Dict[str, Dict[str, float]] = {
+            name: {'calls': 0, 'wins': 0, 'errors': 0, 'cancelled': 0, 'latency_total': 0.0}
+            for name in self._names
+        }
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        各引擎的调用次数、胜出次数、错误与取消次数，以及该引擎音频结束后到出结果的平均延迟（秒）。
+        """
+        result = {}
+        for name, stat in self._stats.items():
+            completed = stat['calls'] - stat['errors'] - stat['cancelled']
+            result[name] = dict(stat, avg_latency=stat['latency_total'] / completed if completed else 0.0)
+        return result
+
+    def _record(self, index: int, audio_ended: Callable[[int], float], task: asyncio.Future):
+        # 每个任务结束时（包括未被采用、稍后结束或被取消的任务）记录一次
+        stat = self._stats[self._names[index]]
+        stat['calls'] += 1
+        if task.cancelled():
+            stat['cancelled'] += 1
+        elif task.exception() is not None:
+            stat['errors'] += 1
+        else:
+            stat['latency_total'] += max(0.0, time.monotonic() - audio_ended(index))
+
+    async def _race(self, coros: List, audio_ended: Callable[[int], float]) -> Optional[str]:
+        loop = asyncio.get_running_loop()
+        tasks = [asyncio.ensure_future(coro) for coro in coros]
+        for index, task in enumerate(tasks):
+            task.add_done_callback(functools.partial(self._record, index, audio_ended))
+        pending = set(tasks)
+        best = None
+        fallback = None
+        deadline = None
+        try:
+            while pending:
+                timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    if task.cancelled() or task.exception() is not None:
+                        continue
+                    index, text = tasks.index(task), task.result()
+                    if not self.is_confident(text):
+                        fallback = fallback or text
+                    elif best is None or index < best[0]:
+                        best = (index, text)
+                if best is not None:
+                    if not any(tasks.index(task) < best[0] for task in pending):
+                        break
+                    if deadline is None:
+                        deadline = loop.time() + self.prefer_window
+        except asyncio.CancelledError:
+            for task in pending:
+                task.cancel()
+            raise
+        finally:
+            for task in pending:
+                loop.call_later(self.measure_timeout, task.cancel)
+        if best is None:
+            return fallback
+        self._stats[self._names[best[0]]]['wins'] += 1
+        return best[1]
+
+    async def arecognize_stream(self, frames: Iterable[np.ndarray], keep_audio_file: bool = False,
+                                on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        # 录音只进行一次，由分发线程把每帧复制到各引擎自己的队列
+        queues = [queue.Queue() for _ in self.engines]
+        # 各引擎收到最后一帧的时间：提前检测到端点的引擎，其音频在停止读取时即已结束
+        ended = [time.monotonic()] * len(self.engines)
+        recorded = []
+        stop = threading.Event()
+
+        def fan_out():
+            try:
+                for frame in frames:
+                    if stop.is_set():
+                        break
+                    if keep_audio_file:
+                        recorded.append(frame)
+                    for q in queues:
+                        q.put(frame)
+            finally:
+                for q in queues:
+                    q.put(_END)
+
+        def drain(index: int, q: queue.Queue) -> Iterator[np.ndarray]:
+            while True:
+                frame = q.get()
+                ended[index] = time.monotonic()
+                if frame is _END:
+                    return
+                yield frame
+
+        feeder = asyncio.get_running_loop().run_in_executor(_executor, fan_out)
+        coros = [engine.arecognize_stream(drain(index, q), False, on_partial)
+                 for index, (engine, q) in enumerate(zip(self.engines, queues))]
+        try:
+            return await self._race(coros, lambda index: ended[index])
+        finally:
+            # 已有结果或被取消时不再需要后续音频
+            stop.set()
+            await feeder
+            if keep_audio_file and recorded:
+                save_wav(np.concatenate(recorded), self.sample_rate)
+
+    async def atranscribe(self, samples: np.ndarray) -> Optional[str]:
+        started = time.monotonic()
+        return await self._race([engine.atranscribe(samples) for engine in self.engines], lambda index: started)
+
+    def transcribe(self, samples: np.ndarray) -> Optional[str]:
+        return background_loop.run(self.atranscribe(samples))
+
+    def recognize_stream(self, frames: Iterable[np.ndarray], keep_audio_file: bool = False) -> Iterator[Tuple[str, bool]]:
+        text = background_loop.run(self.arecognize_stream(frames, keep_audio_file))
+        if text is not None:
+            yield text, True
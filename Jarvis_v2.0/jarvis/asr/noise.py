@@ -0,0 +1,35 @@
+import numpy as np
+from typing import Optional
+
+class NoiseFloorEstimator:
+    """
+    后台噪声基底估计：对空闲采集流逐帧计算 RMS 并做滑动平均，
+    持续给出能量阈值，替代每次识别前 1 秒的 adjust_for_ambient_noise。
+    """
+    def __init__(self, ratio: float = 1.5, time_constant: float = 2.0, slow_time_constant: float = 30.0,
+                 frame_duration: float = 0.032, min_threshold: float = 50.0, max_threshold: float = 4000.0):
+        self.ratio = ratio
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self._alpha = min(1.0, frame_duration / time_constant)
+        # 高于阈值的帧多为语音，只允许极慢地抬高基底，以适应持续性的新噪声源
+        self._slow_alpha = min(1.0, frame_duration / slow_time_constant)
+        self.noise_floor: Optional[float] = None
+
+    def update(self, frame: np.ndarray):
+        rms = float(np.sqrt(np.mean(np.square(frame, dtype=np.float32))))
+        if self.noise_floor is None:
+            self.noise_floor = rms
+        elif rms < self.noise_floor:
+            # 噪声下降时快速跟随
+            self.noise_floor += 4 * self._alpha * (rms - self.noise_floor)
+        elif rms < self.energy_threshold:
+            self.noise_floor += self._alpha * (rms - self.noise_floor)
+        else:
+            self.noise_floor += self._slow_alpha * (rms - self.noise_floor)
+
+    @property
+    def energy_threshold(self) -> float:
+        if self.noise_floor is None:
+            return self.min_threshold
+        return max(self.min_threshold, min(self.max_threshold, self.noise_floor * self.ratio))
@@ -0,0 +1,83 @@
+from collections import deque
+from typing import Iterable, Iterator, Optional
+import numpy as np
+from .noise import NoiseFloorEstimator
+
+class VADEndpointer:
+    """
+    帧级语音活动检测与端点切分：能量高于噪声阈值且能量主要落在语音频带内的帧判为语音，
+    语音开始后连续静音超过 hangover 秒即结束本句。
+    """
+    def __init__(self, sample_rate: int = 16000, hangover: float = 0.6, start_timeout: float = 8.0,
+                 max_utterance: float = 15.0, min_speech: float = 0.1, padding: float = 0.3,
+                 band: tuple = (300.0, 3400.0), min_band_ratio: float = 0.4):
+        self.sample_rate = sample_rate
+        self.hangover = hangover
+        self.start_timeout = start_timeout
+        self.max_utterance = max_utterance
+        self.min_speech = min_speech
+        self.padding = padding
+        self.band = band
+        self.min_band_ratio = min_band_ratio
+        # 按帧长缓存窗函数与频带掩码，避免逐帧重复计算
+        self._frame_length = None
+        self._window = None
+        self._band_mask = None
+
+    def _prepare(self, frame_length: int):
+        if self._frame_length == frame_length:
+            return
+        freqs = np.fft.rfftfreq(frame_length, 1.0 / self.sample_rate)
+        self._window = np.hanning(frame_length).astype(np.float32)
+        self._band_mask = (freqs >= self.band[0]) & (freqs <= self.band[1])
+        self._frame_length = frame_length
+
+    def is_speech(self, frame: np.ndarray, energy_threshold: float) -> bool:
+        samples = frame.astype(np.float32)
+        rms = float(np.sqrt(np.mean(np.square(samples))))
+        if rms < energy_threshold:
+            return False
+        self._prepare(len(samples))
+        power = np.abs(np.fft.rfft(samples * self._window)) ** 2
+        total = float(power.sum())
+        return total > 0 and float(power[self._band_mask].sum()) / total >= self.min_band_ratio
+
+    def segment(self, frames: Iterable[np.ndarray], noise_floor: Optional[NoiseFloorEstimator] = None) -> Iterator[np.ndarray]:
+        """
+        从连续帧中切出一句话并逐帧产出（含起点前 padding 秒的音频），到达端点即停止。
+        未提供噪声估计时在本句内自行估计，且只用非语音帧更新。
+        """
+        own_estimator = noise_floor is None
+        if own_estimator:
+            noise_floor = NoiseFloorEstimator()
+        elapsed = 0.0
+        speech_run = 0.0
+        silence_run = 0.0
+        speech_started = False
+        pending = deque()
+        pending_duration = 0.0
+        for frame in frames:
+            duration = len(frame) / self.sample_rate
+            elapsed += duration
+            speech = self.is_speech(frame, noise_floor.energy_threshold)
+            if own_estimator and not speech:
+                noise_floor.update(frame)
+            if not speech_started:
+                pending.append(frame)
+                pending_duration += duration
+                speech_run = speech_run + duration if speech else 0.0
+                if speech_run >= self.min_speech:
+                    speech_started = True
+                    elapsed = pending_duration
+                    yield from pending
+                    pending.clear()
+                    continue
+                while len(pending) > 1 and pending_duration - len(pending[0]) / self.sample_rate >= self.padding + speech_run:
+                    pending_duration -= len(pending.popleft()) / self.sample_rate
+                if elapsed >= self.start_timeout:
+                    return
+                continue
+            yield frame
+            silence_run = 0.0 if speech else silence_run + duration
+            if silence_run >= self.hangover or elapsed >= self.max_utterance:
+                return
@@ -1,93 +1,279 @@
+import queue
 import threading
 import pyaudio
-import wave
-from pydub import AudioSegment
-import os
-from typing import Optional
+import numpy as np
+from collections import deque
+from typing import Deque, Dict, Optional, Set
+from .dsp import GainRamp, Mixer
+from .stream import AudioInput, StreamingSource
+
+# 音源优先级：语音播放时自动闪避（压低）音乐
+PRIORITY_MUSIC = 0
+PRIORITY_SPEECH = 1
+
+class _Source:
+    def __init__(self, input: AudioInput, stream: StreamingSource, priority: int, ramp_frames: int):
+        self.input = input
+        self.stream = stream
+        self.priority = priority
+        self.volume = 1.0
+        self.gain = GainRamp(ramp_frames=ramp_frames)
+
+    def read(self, frames: int) -> np.ndarray:
+        return self.stream.read(frames)
+
+    @property
+    def finished(self) -> bool:
+        return self.stream.finished
 
 class AudioPlayer:
-    def __init__(self):
+    """
+    单输出流播放器：所有音源流式解码为 rate/channels 的 16bit PCM，经 Mixer 混音后输出。
+    播放控制（play/pause/resume/seek/stop/volume）以命令形式入队，由唯一的控制线程顺序处理；
+    输出使用 PyAudio 回调模式，暂停或空闲时停止输出流，不占用 CPU。
+    暂停按优先级记录：暂停音乐后播放语音不会恢复音乐，语音结束后音乐仍保持暂停。
+    每个优先级可排队多个音源（如连续的语音播报），当前音源结束后依次播放。
+    """
+    def __init__(self, rate: int = 44100, channels: int = 2, frames_per_buffer: int = 1024, duck_level: float = 0.2):
         self._lock = threading.Lock()
-        self._is_playing = False
-        self._is_paused = False
         self._stream = None
         self._audio = pyaudio.PyAudio()
-        self._thread = None
-        self._volume = 1.0
-        self._file_path = None
-        self._audio_segment = None
-        self._frame_index = 0
+        self.rate = rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self.duck_level = duck_level
+        self._mixer = Mixer(channels, frames_per_buffer)
+        self._silence = bytes(frames_per_buffer * channels * 2)
+        # 每个优先级同时只保留一个音源
+        self._sources: Dict[int, _Source] = {}
+        self._volumes: Dict[int, float] = {}
+        self._pending: Dict[int, Deque[AudioInput]] = {}
+        # 已暂停的优先级，暂停的音源保留读取位置但不参与混音
+        self._paused: Set[int] = set()
+        # duck() 设置的临时增益，作用于语音以下优先级
+        self._listen_duck = 1.0
+        # 约 50ms 的增益过渡
+        self._ramp_frames = rate // 20
+        self._commands = queue.Queue()
+        self._thread = threading.Thread(target=self._control_loop, name='jarvis-audio', daemon=True)
+        self._thread.start()
+
+    def play(self, source: AudioInput, priority: int = PRIORITY_MUSIC, enqueue: bool = False):
+        """
+        播放音频：source 可以是文件路径、bytes 或逐块产出 bytes 的迭代器，边解码边播放。
+        同优先级的旧音源（及其排队音源）被替换，enqueue=True 时改为排在其后播放；
+        高优先级音源播放期间低优先级音源被闪避。
+        """
+        self._commands.put(('play', source, priority, enqueue))
+
+    def pause(self, priority: Optional[int] = None):
+        """
+        暂停指定优先级的音源，未指定时暂停当前所有音源；其余优先级照常播放。
+        """
+        self._commands.put(('pause', priority))
+
+    def resume(self, priority: Optional[int] = None):
+        """
+        恢复指定优先级的音源，未指定时恢复全部已暂停的音源。
+        """
+        self._commands.put(('resume', priority))
+
+    def seek(self, seconds: float, priority: int = PRIORITY_MUSIC):
+        """
+        跳转到指定秒数，仅支持以文件路径播放的音源。
+        """
+        self._commands.put(('seek', seconds, priority))
+
+    def stop(self, priority: Optional[int] = None):
+        """
+        停止指定优先级的音源（含排队音源），未指定时停止全部播放。
+        """
+        self._commands.put(('stop', priority))
+
+    def set_volume(self, volume: float, priority: int = PRIORITY_MUSIC):
+        self._commands.put(('volume', volume, priority))
+
+    def duck(self, level: float = 0.1):
+        """
+        临时压低语音以下优先级的音源（如唤醒后聆听期间），不改变各音源的音量设置，unduck 后恢复；
+        期间新开始播放的音源同样被压低。
+        """
+        self._commands.put(('duck', level))
+
+    def unduck(self):
+        self._commands.put(('duck', 1.0))
+
+    def _control_loop(self):
+        while True:
+            command, *args = self._commands.get()
+            try:
+                getattr(self, f'_on_{command}')(*args)
+            except Exception as e:
+                print(f"音频控制命令 {command} 执行失败", e)
+
+    def _open_stream(self):
+        if self._stream is None:
+            self._stream = self._audio.open(
+                format=pyaudio.paInt16,
+                channels=self.channels,
+                rate=self.rate,
+                output=True,
+                frames_per_buffer=self.frames_per_buffer,
+                stream_callback=self._callback,
+                start=False
+            )
+        with self._lock:
+            active = bool(self._active_sources())
+        if active and not self._stream.is_active():
+            self._stream.start_stream()
+
+    def _active_sources(self) -> Dict[int, _Source]:
+        # 调用方需持有 self._lock
+        return {p: s for p, s in self._sources.items() if p not in self._paused}
+
+    def _new_source(self, input: AudioInput, priority: int, start: float = 0.0) -> _Source:
+        stream = StreamingSource(input, self.rate, self.channels, max_read_frames=self.frames_per_buffer, start=start)
+        source = _Source(input, stream, priority, self._ramp_frames)
+        source.volume = self._volumes.get(priority, 1.0)
+        return source
+
+    def _replace(self, priority: int, source: Optional[_Source]):
+        with self._lock:
+            replaced = self._sources.pop(priority, None)
+            if source:
+                self._sources[priority] = source
+            self._update_gains()
+        if replaced:
+            replaced.stream.close()
+
+    def _on_play(self, input: AudioInput, priority: int, enqueue: bool):
+        with self._lock:
+            pending = self._pending.setdefault(priority, deque())
+            if enqueue and (priority in self._sources or pending):
+                pending.append(input)
+                return
+            pending.clear()
+            # 新音源只解除本优先级的暂停
+            self._paused.discard(priority)
+        self._replace(priority, self._new_source(input, priority))
+        self._open_stream()
+
+    def _on_pause(self, priority: Optional[int]):
+        with self._lock:
+            priorities = list(self._sources) if priority is None else [priority]
+            self._paused.update(p for p in priorities if p in self._sources)
+            self._update_gains()
+        self._on_idle()
 
-    def play(self, file_path: str):
+    def _on_resume(self, priority: Optional[int]):
         with self._lock:
-            self.stop()
-            self._file_path = file_path
-            self._audio_segment = AudioSegment.from_file(file_path)
-            self._is_playing = True
-            self._is_paused = False
-            self._frame_index = 0
-            self._thread = threading.Thread(target=self._playback)
-            self._thread.start()
-
-    def _playback(self):
-        stream = self._audio.open(
-            format=self._audio.get_format_from_width(self._audio_segment.sample_width),
-            channels=self._audio_segment.channels,
-            rate=self._audio_segment.frame_rate,
-            output=True
-        )
-        self._stream = stream
-        chunk_size = 1024
-        raw_data = self._audio_segment.raw_data
-        total_frames = len(raw_data) // (self._audio_segment.sample_width * self._audio_segment.channels)
-        while self._is_playing and self._frame_index < total_frames:
-            if self._is_paused:
-                continue
-            start = self._frame_index * self._audio_segment.sample_width * self._audio_segment.channels
-            end = start + chunk_size * self._audio_segment.sample_width * self._audio_segment.channels
-            chunk = raw_data[start:end]
-            if self._volume != 1.0:
-                chunk = AudioSegment(
-                    chunk,
-                    frame_rate=self._audio_segment.frame_rate,
-                    sample_width=self._audio_segment.sample_width,
-                    channels=self._audio_segment.channels
-                ) - (1.0 - self._volume) * 60  # 简单音量调整
-                chunk = chunk.raw_data
-            stream.write(chunk)
-            self._frame_index += chunk_size
-        stream.stop_stream()
-        stream.close()
-        self._is_playing = False
-        self._is_paused = False
-
-    def pause(self):
+            if priority is None:
+                self._paused.clear()
+            else:
+                self._paused.discard(priority)
+            self._update_gains()
+        self._open_stream()
+
+    def _on_seek(self, seconds: float, priority: int):
+        source = self._sources.get(priority)
+        if source and source.stream.seekable:
+            self._replace(priority, self._new_source(source.input, priority, max(0.0, seconds)))
+
+    def _on_stop(self, priority: Optional[int]):
+        with self._lock:
+            for p, pending in self._pending.items():
+                if priority is None or p == priority:
+                    pending.clear()
+        priorities = list(self._sources) if priority is None else [priority]
         with self._lock:
-            if self._is_playing and not self._is_paused:
-                self._is_paused = True
+            self._paused.difference_update(priorities)
+        for p in priorities:
+            self._replace(p, None)
+        self._on_idle()
 
-    def resume(self):
+    def _on_volume(self, volume: float, priority: int):
         with self._lock:
-            if self._is_playing and self._is_paused:
-                self._is_paused = False
+            self._volumes[priority] = max(0.0, min(1.0, volume))
+            source = self._sources.get(priority)
+            if source:
+                source.volume = self._volumes[priority]
+                self._update_gains()
 
-    def stop(self):
+    def _on_advance(self, priority: int):
+        # 回调线程发现某优先级的音源结束且有排队音源时，由控制线程创建下一个音源
         with self._lock:
-            self._is_playing = False
-            self._is_paused = False
-            if self._stream:
-                self._stream.stop_stream()
-                self._stream.close()
-                self._stream = None
-
-    def set_volume(self, volume: float):
+            pending = self._pending.get(priority)
+            if priority in self._sources or not pending:
+                return
+            input = pending.popleft()
+        self._replace(priority, self._new_source(input, priority))
+        self._open_stream()
+
+    def _on_duck(self, level: float):
         with self._lock:
-            self._volume = max(0.0, min(1.0, volume))
+            self._listen_duck = max(0.0, min(1.0, level))
+            self._update_gains()
+
+    def _on_idle(self):
+        # 回调线程发现所有音源已结束（或均已暂停）时通知控制线程停止输出流
+        with self._lock:
+            idle = not self._active_sources() and not any(
+                pending for p, pending in self._pending.items() if p not in self._paused)
+        if idle and self._stream and self._stream.is_active():
+            self._stream.stop_stream()
+
+    def _update_gains(self):
+        # 已暂停的高优先级音源不再闪避低优先级音源
+        active = self._active_sources()
+        top = max(active) if active else PRIORITY_MUSIC
+        for priority, source in self._sources.items():
+            duck = self.duck_level if priority < top else 1.0
+            if priority < PRIORITY_SPEECH:
+                duck *= self._listen_duck
+            source.gain.set_target(source.volume * duck)
+
+    def _next_chunk(self, frames: int) -> Optional[np.ndarray]:
+        with self._lock:
+            finished = [p for p, s in self._sources.items() if s.finished]
+            for priority in finished:
+                self._sources.pop(priority).stream.close()
+                if self._pending.get(priority):
+                    self._commands.put(('advance', priority))
+            if finished:
+                self._update_gains()
+            active = self._active_sources()
+            if not active:
+                return None
+            chunks = [(source.read(frames), source.gain) for source in active.values()]
+        return self._mixer.mix(chunks, frames)
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        chunk = self._next_chunk(min(frame_count, self.frames_per_buffer))
+        if chunk is None:
+            self._commands.put(('idle',))
+            return self._silence[:frame_count * self.channels * 2], pyaudio.paContinue
+        return chunk.tobytes(), pyaudio.paContinue
 
     @property
     def is_playing(self) -> bool:
-        return self._is_playing
+        with self._lock:
+            return bool(self._active_sources()) or any(
+                pending for p, pending in self._pending.items() if p not in self._paused)
 
     @property
     def is_paused(self) -> bool:
-        return self._is_paused 
\ No newline at end of file
+        with self._lock:
+            return any(p in self._sources for p in self._paused)
+
+_shared_player: Optional[AudioPlayer] = None
+_shared_lock = threading.Lock()
+
+def get_audio_player() -> AudioPlayer:
+    """
+    进程内共享的播放器：TTS、音乐等所有播放都经由同一个输出设备。
+    """
+    global _shared_player
+    with _shared_lock:
+        if _shared_player is None:
+            _shared_player = AudioPlayer()
+        return _shared_player
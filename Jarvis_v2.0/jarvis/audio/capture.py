@@ -0,0 +1,132 @@
+import threading
+import numpy as np
+import pyaudio
+from typing import Callable, Iterator, List, Optional, Tuple
+
+class MicrophoneCapture:
+    """
+    共享麦克风采集服务：只打开一个输入流，后台线程持续把 int16 帧写入环形缓冲区，
+    唤醒词与 ASR 各自持有读游标读取，互不抢占设备。
+    """
+    def __init__(self, sample_rate: int = 16000, frame_length: int = 512, buffer_seconds: float = 10.0, input_device_index: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.capacity = max(1, int(buffer_seconds * sample_rate / frame_length))
+        self.input_device_index = input_device_index
+        self._buffer = np.zeros((self.capacity, frame_length), dtype=np.int16)
+        # 已写入的帧总数，只由采集线程递增；读者据此判断数据是否就绪或已被覆盖
+        self._write_index = 0
+        self._new_frame = threading.Condition()
+        self._listeners: List[Callable[[np.ndarray], None]] = []
+        self._audio = None
+        self._stream = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            input_device_index=self.input_device_index,
+            rate=self.sample_rate,
+            channels=1,
+            format=pyaudio.paInt16,
+            input=True,
+            frames_per_buffer=self.frame_length
+        )
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._stream:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio:
+            self._audio.terminate()
+            self._audio = None
+        with self._new_frame:
+            self._new_frame.notify_all()
+
+    def add_listener(self, listener: Callable[[np.ndarray], None]):
+        """
+        注册帧回调，在采集线程中以只读视图调用，回调需尽快返回。
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[np.ndarray], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _run(self):
+        while self._running:
+            data = self._stream.read(self.frame_length, exception_on_overflow=False)
+            slot = self._buffer[self._write_index % self.capacity]
+            slot[:] = np.frombuffer(data, dtype=np.int16)
+            self._write_index += 1
+            view = slot.view()
+            view.flags.writeable = False
+            for listener in list(self._listeners):
+                listener(view)
+            with self._new_frame:
+                self._new_frame.notify_all()
+
+    @property
+    def cursor(self) -> int:
+        """
+        下一帧的序号，新读者从这里开始即可只读到之后的音频。
+        """
+        return self._write_index
+
+    def preroll_cursor(self, seconds: float) -> int:
+        """
+        回退 seconds 秒的游标，用于读取触发点之前的音频。
+        """
+        frames = int(seconds * self.sample_rate / self.frame_length)
+        oldest = max(0, self._write_index - self.capacity + 1)
+        return max(oldest, self._write_index - frames)
+
+    def read(self, cursor: int, timeout: Optional[float] = None) -> Tuple[Optional[np.ndarray], int]:
+        """
+        读取 cursor 处的一帧（副本），返回 (帧, 下一游标)；超时或已停止时帧为 None。
+        """
+        frame = np.empty(self.frame_length, dtype=np.int16)
+        ok, cursor = self.read_into(cursor, frame, timeout)
+        return (frame if ok else None), cursor
+
+    def read_into(self, cursor: int, out: np.ndarray, timeout: Optional[float] = None) -> Tuple[bool, int]:
+        """
+        把 cursor 处的一帧拷贝到调用方预分配的 out 中，返回 (是否成功, 下一游标)。
+        读者落后超过缓冲区长度时跳到最旧的可用帧。
+        """
+        if self._write_index <= cursor:
+            with self._new_frame:
+                self._new_frame.wait_for(lambda: self._write_index > cursor or not self._running, timeout)
+            if self._write_index <= cursor:
+                return False, cursor
+        while True:
+            cursor = max(cursor, self._write_index - self.capacity + 1)
+            np.copyto(out, self._buffer[cursor % self.capacity])
+            # 复制期间若该槽位被覆盖则重读
+            if self._write_index - cursor < self.capacity:
+                return True, cursor + 1
+
+    def frames(self, start: Optional[int] = None, duration: Optional[float] = None) -> Iterator[np.ndarray]:
+        """
+        从 start 游标（默认当前位置）开始持续产出帧，直到超过 duration 秒或采集停止。
+        """
+        cursor = self.cursor if start is None else start
+        remaining = None if duration is None else int(duration * self.sample_rate / self.frame_length)
+        while self._running and (remaining is None or remaining > 0):
+            frame, cursor = self.read(cursor, timeout=1.0)
+            if frame is None:
+                continue
+            if remaining is not None:
+                remaining -= 1
+            yield frame
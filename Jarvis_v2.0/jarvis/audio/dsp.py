@@ -0,0 +1,81 @@
+import numpy as np
+from typing import Iterable, Tuple
+
+class GainRamp:
+    """
+    平滑增益：目标增益变化时在 ramp_frames 帧内线性过渡，避免突变产生爆音。
+    """
+    def __init__(self, gain: float = 1.0, ramp_frames: int = 2205, max_frames: int = 4096):
+        self.gain = gain
+        self.target = gain
+        self.ramp_frames = max(1, ramp_frames)
+        self._step = 0.0
+        # 距离到达目标还剩的帧数，为 0 时增益恒定
+        self._remaining = 0
+        self._steps = np.arange(1, max_frames + 1, dtype=np.float32)
+        self._ramp = np.empty(max_frames, dtype=np.float32)
+
+    def set_target(self, target: float):
+        """
+        从当前增益出发，在 ramp_frames 帧内线性过渡到 target；目标未变时不重新开始过渡。
+        """
+        if target == self.target:
+            return
+        self.target = target
+        self._step = (target - self.gain) / self.ramp_frames
+        self._remaining = self.ramp_frames
+
+    def apply(self, buffer: np.ndarray):
+        """
+        对 (帧数, 声道) 的 float32 缓冲区原地施加增益。
+        """
+        frames = buffer.shape[0]
+        if self._remaining == 0:
+            if self.gain != 1.0:
+                buffer *= self.gain
+            return
+        ramping = min(frames, self._remaining)
+        ramp = self._ramp[:frames]
+        np.multiply(self._steps[:ramping], self._step, out=ramp[:ramping])
+        ramp[:ramping] += self.gain
+        ramp[ramping:] = self.target
+        self._remaining -= ramping
+        # 过渡结束时直接取目标值，避免浮点累积误差
+        self.gain = self.target if self._remaining == 0 else float(ramp[ramping - 1])
+        if self._remaining == 0:
+            ramp[ramping - 1] = self.target
+        buffer *= ramp[:, np.newaxis]
+
+class Mixer:
+    """
+    多路混音：各音源按自身增益叠加到预分配的 float32 累加缓冲区，
+    再经主增益、限幅后写入预分配的 int16 输出缓冲区。
+    """
+    def __init__(self, channels: int = 2, frames_per_buffer: int = 1024):
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self.master = GainRamp(max_frames=frames_per_buffer)
+        self._accumulator = np.zeros((frames_per_buffer, channels), dtype=np.float32)
+        self._scratch = np.zeros((frames_per_buffer, channels), dtype=np.float32)
+        self._output = np.zeros((frames_per_buffer, channels), dtype=np.int16)
+
+    def mix(self, sources: Iterable[Tuple[np.ndarray, GainRamp]], frames: int) -> np.ndarray:
+        """
+        sources 为 (int16 数据 (n, 声道), 增益) 序列，n 不足 frames 的部分视为静音。
+        返回输出缓冲区的视图，下次调用前有效。
+        """
+        accumulator = self._accumulator[:frames]
+        accumulator.fill(0)
+        for data, gain in sources:
+            n = min(frames, data.shape[0])
+            if n == 0:
+                continue
+            scratch = self._scratch[:n]
+            np.copyto(scratch, data[:n], casting='unsafe')
+            gain.apply(scratch)
+            accumulator[:n] += scratch
+        self.master.apply(accumulator)
+        np.clip(accumulator, -32768, 32767, out=accumulator)
+        output = self._output[:frames]
+        np.copyto(output, accumulator, casting='unsafe')
+        return output
@@ -0,0 +1,137 @@
+import subprocess
+import threading
+import numpy as np
+from pydub import AudioSegment
+from typing import Iterable, Union
+
+AudioInput = Union[str, bytes, Iterable[bytes]]
+
+class StreamingSource:
+    """
+    流式解码音源：ffmpeg 子进程把输入增量解码为 rate/channels 的 16bit PCM，写入有界环形缓冲区。
+    输入可以是文件路径、完整的 bytes，或逐块产出 bytes 的迭代器（如 HTTP 分块响应、流式 TTS）。
+    缓冲满时解码线程阻塞，内存占用与音频总长度无关。
+    """
+    def __init__(self, source: AudioInput, rate: int = 44100, channels: int = 2, buffer_seconds: float = 2.0,
+                 prebuffer: float = 0.3, max_read_frames: int = 4096, start: float = 0.0):
+        self.rate = rate
+        self.channels = channels
+        self.capacity = int(buffer_seconds * rate)
+        self.prebuffer_frames = min(self.capacity, int(prebuffer * rate))
+        self._ring = np.zeros((self.capacity, channels), dtype=np.int16)
+        self._out = np.zeros((max_read_frames, channels), dtype=np.int16)
+        # 单调递增的读写帧计数
+        self._read_pos = 0
+        self._write_pos = 0
+        self._ready = False
+        self._eof = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self.seekable = isinstance(source, str)
+        args = [AudioSegment.converter, '-loglevel', 'error']
+        if start > 0:
+            args += ['-ss', str(start)]
+        args += ['-i', source if self.seekable else 'pipe:0',
+                 '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', str(channels), '-ar', str(rate), 'pipe:1']
+        self._process = subprocess.Popen(
+            args,
+            stdin=subprocess.DEVNULL if self.seekable else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        if not self.seekable:
+            chunks = [source] if isinstance(source, (bytes, bytearray)) else source
+            threading.Thread(target=self._feed, args=(chunks,), daemon=True).start()
+        threading.Thread(target=self._decode, daemon=True).start()
+
+    def _feed(self, chunks: Iterable[bytes]):
+        try:
+            for chunk in chunks:
+                if self._closed:
+                    break
+                self._process.stdin.write(chunk)
+        except (BrokenPipeError, ValueError):
+            pass
+        finally:
+            try:
+                self._process.stdin.close()
+            except (BrokenPipeError, ValueError):
+                pass
+
+    def _decode(self):
+        frame_bytes = 2 * self.channels
+        pending = b''
+        while not self._closed:
+            data = self._process.stdout.read1(16384)
+            if not data:
+                break
+            data = pending + data
+            usable = len(data) - len(data) % frame_bytes
+            pending = data[usable:]
+            frames = np.frombuffer(data[:usable], dtype=np.int16).reshape(-1, self.channels)
+            offset = 0
+            while offset < frames.shape[0] and not self._closed:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closed or self._write_pos - self._read_pos < self.capacity)
+                    free = self.capacity - (self._write_pos - self._read_pos)
+                n = min(free, frames.shape[0] - offset)
+                if n <= 0:
+                    continue
+                start = self._write_pos % self.capacity
+                first = min(n, self.capacity - start)
+                self._ring[start:start + first] = frames[offset:offset + first]
+                self._ring[:n - first] = frames[offset + first:offset + n]
+                offset += n
+                with self._cond:
+                    self._write_pos += n
+                    if self._write_pos >= self.prebuffer_frames:
+                        self._ready = True
+                    self._cond.notify_all()
+        with self._cond:
+            self._eof = True
+            self._ready = True
+            self._cond.notify_all()
+        self._process.wait()
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        """
+        等待预缓冲就绪（或解码结束）。
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._ready, timeout)
+
+    def read(self, frames: int) -> np.ndarray:
+        """
+        非阻塞读取最多 frames 帧；预缓冲未就绪或解码跟不上时返回更少甚至零帧。
+        返回的是内部缓冲区视图，下次调用前有效。
+        """
+        if not self._ready:
+            return self._out[:0]
+        available = self._write_pos - self._read_pos
+        n = min(frames, available, self._out.shape[0])
+        start = self._read_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self._out[:first] = self._ring[start:start + first]
+        self._out[first:n] = self._ring[:n - first]
+        with self._cond:
+            self._read_pos += n
+            self._cond.notify_all()
+        return self._out[:n]
+
+    @property
+    def position(self) -> float:
+        """
+        已读出的时长（秒）。
+        """
+        return self._read_pos / self.rate
+
+    @property
+    def finished(self) -> bool:
+        return self._eof and self._read_pos >= self._write_pos
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._process.poll() is None:
+            self._process.kill()
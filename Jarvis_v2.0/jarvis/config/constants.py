@@ -8,6 +8,11 @@ welcome_tips = [
     "Allow me to introduce myself. I'm JARVIS, a virtual artificial intelligence, and I'm here to assist you with a variety of tasks as best as I can. 24 hours a day, seven days a week. Importing all preferences from home interface. Begin systems check."
 ]
 
+not_heard_tip = '抱歉，我没有听清，请再说一遍'
+
+# 固定话术，启动时预先合成并缓存
+fixed_phrases = welcome_tips + [not_heard_tip]
+
 def welcome():
     return random.choice(welcome_tips)
 
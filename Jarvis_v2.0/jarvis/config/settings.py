@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv, find_dotenv
 
 class Settings:
@@ -16,11 +17,35 @@ class Settings:
         self.PLAY_WELCOME_VOICE = os.getenv('PLAY_WELCOME_VOICE', 'False').lower() == 'true'
         self.ENABLE_CHINESE_CORRECT = os.getenv('ENABLE_CHINESE_CORRECT', 'False').lower() == 'true'
         self.ENABLE_SEMANTIC_ANALYSIS = os.getenv('ENABLE_SEMANTIC_ANALYSIS', 'False').lower() == 'true'
+        self.ENABLE_LOCAL_INTENT = os.getenv('ENABLE_LOCAL_INTENT', 'True').lower() == 'true'
         self.OPENWEATHERMAP_API_KEY = os.getenv('OPENWEATHERMAP_API_KEY')
         self.RASA_NLU_ENDPOINT = os.getenv('RASA_NLU_ENDPOINT')
         self.SHERPA_MODEL_PATH = os.getenv('SHERPA_MODEL_PATH')
+        self.SHERPA_NUM_THREADS = int(os.getenv('SHERPA_NUM_THREADS', '4'))
+        self.SHERPA_WARMUP = os.getenv('SHERPA_WARMUP', 'True').lower() == 'true'
+        self.ASR_ENGINE = os.getenv('ASR_ENGINE', 'whisper')
+        self.ASR_PREROLL = float(os.getenv('ASR_PREROLL', '0.3'))
+        self.ASR_HEDGE_PREFER_WINDOW = float(os.getenv('ASR_HEDGE_PREFER_WINDOW', '0.3'))
+        self.MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR')
+        self.TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', os.path.join(Path.home(), '.jarvis', 'tts_cache'))
+        self.TTS_CACHE_MAX_MB = int(os.getenv('TTS_CACHE_MAX_MB', '200'))
+        self.EDGE_VOICES_FILE = os.getenv('EDGE_VOICES_FILE', os.path.join(Path.home(), '.jarvis', 'edge_voices.json'))
+        self.EDGE_VOICES_TTL_HOURS = float(os.getenv('EDGE_VOICES_TTL_HOURS', '168'))
+        self.HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '10'))
+        self.HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '2'))
+        self.HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+        self.HTTP2 = os.getenv('HTTP2', 'False').lower() == 'true'
+        self.KEEP_AUDIO_FILE = os.getenv('KEEP_AUDIO_FILE', 'False').lower() == 'true'
         self.LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'openai')
         self.LLM_MODEL = os.getenv('LLM_MODEL', 'gpt-3.5-turbo')
+        self.LLM_MAX_TOOLS = int(os.getenv('LLM_MAX_TOOLS', '8'))
+        self.ENABLE_LLM_CACHE = os.getenv('ENABLE_LLM_CACHE', 'True').lower() == 'true'
+        self.LLM_CACHE_MAX_ITEMS = int(os.getenv('LLM_CACHE_MAX_ITEMS', '256'))
+        self.LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', '600'))
+        self.LLM_CACHE_EMBEDDING_MODEL = os.getenv('LLM_CACHE_EMBEDDING_MODEL')
+        self.LLM_CACHE_SIMILARITY = float(os.getenv('LLM_CACHE_SIMILARITY', '0.92'))
+        self.LLM_CACHE_EMBED_TIMEOUT = float(os.getenv('LLM_CACHE_EMBED_TIMEOUT', '0.3'))
+        self.LLM_CACHE_BYPASS_TOOLS = [name for name in os.getenv('LLM_CACHE_BYPASS_TOOLS', 'query_time,query_date,query_weather').split(',') if name]
         self.DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY')
         self.DEEPSEEK_API_ENDPOINT = os.getenv('DEEPSEEK_API_ENDPOINT')
 
@@ -0,0 +1,35 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+class BackgroundLoop:
+    """
+    常驻后台线程的事件循环，供同步代码提交协程并拿到 concurrent.futures.Future。
+    """
+    def __init__(self, name: str = 'jarvis-aio'):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def submit(self, coro: Coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        在后台循环中执行协程并阻塞等待结果。
+        """
+        return self.submit(coro).result(timeout)
+
+# 全局后台事件循环
+background_loop = BackgroundLoop()
@@ -0,0 +1,102 @@
+import importlib
+import importlib.util
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional
+
+class _Session(requests.Session):
+    """
+    未显式指定 timeout 的请求使用默认超时，避免远端无响应时阻塞调用方。
+    """
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+class HttpClient:
+    """
+    插件共享的 HTTP 客户端：keep-alive 连接池复用 TCP/TLS 连接，默认超时，
+    幂等请求在连接错误与 429/5xx 时按指数退避重试。
+    同步接口基于 requests；async_client 为 httpx.AsyncClient（可选 HTTP/2），需在后台事件循环中使用。
+    """
+    def __init__(self, timeout: float = 10.0, retries: int = 2, backoff: float = 0.3, pool_size: int = 10,
+                 http2: bool = False, user_agent: Optional[str] = None):
+        self.timeout = timeout
+        self.retries = retries
+        self.pool_size = pool_size
+        self.http2 = http2
+        self.session = _Session(timeout)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=backoff,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS'}),
+                raise_on_status=False
+            )
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if user_agent:
+            self.session.headers['User-Agent'] = user_agent
+        self._async_client = None
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.session.post(url, **kwargs)
+
+    @property
+    def async_client(self):
+        """
+        延迟创建的 httpx.AsyncClient；传输层仅对连接错误重试。未安装 h2 时退回 HTTP/1.1。
+        """
+        with self._lock:
+            if self._async_client is None:
+                httpx = importlib.import_module('httpx')
+                http2 = self.http2 and importlib.util.find_spec('h2') is not None
+                if self.http2 and not http2:
+                    print("未安装 h2，HTTP/2 不可用，使用 HTTP/1.1")
+                limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+                self._async_client = httpx.AsyncClient(
+                    http2=http2,
+                    timeout=self.timeout,
+                    limits=limits,
+                    headers={'User-Agent': self.session.headers['User-Agent']},
+                    transport=httpx.AsyncHTTPTransport(http2=http2, limits=limits, retries=self.retries)
+                )
+            return self._async_client
+
+    def close(self):
+        self.session.close()
+
+_shared_client: Optional[HttpClient] = None
+_shared_lock = threading.Lock()
+
+def get_http_client() -> HttpClient:
+    """
+    进程内共享的 HTTP 客户端，参数取自配置。
+    """
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            from jarvis.config.settings import settings
+            _shared_client = HttpClient(
+                timeout=settings.HTTP_TIMEOUT,
+                retries=settings.HTTP_RETRIES,
+                pool_size=settings.HTTP_POOL_SIZE,
+                http2=settings.HTTP2
+            )
+        return _shared_client
@@ -1,67 +1,145 @@
-import json
+import os
+import threading
 from jarvis.config.settings import settings
 from jarvis.wakeword import PicovoiceWakeWord
-from jarvis.asr import BaiduASR, PaddleSpeechASR, WhisperASR, SherpaASR
+from jarvis.asr.factory import create_asr_engine
+from jarvis.asr.noise import NoiseFloorEstimator
 from jarvis.tts import BaiduTTS, Pyttsx3TTS, PaddleSpeechTTS, EdgeTTS
+from jarvis.tts.cache import SpeechCache
 from jarvis.llm import get_llm_client
 from jarvis.tools import registry
 from jarvis.actions import trigger
-from jarvis.audio import AudioPlayer
-from jarvis.config.constants import TTSEngineProvider, ASREngineProvider
+from jarvis.intent import intent_matcher
+from jarvis.audio import AudioPlayer, PRIORITY_SPEECH, get_audio_player
+from jarvis.audio.capture import MicrophoneCapture
+from jarvis.config.constants import TTSEngineProvider, ASREngineProvider, fixed_phrases, not_heard_tip
+from jarvis.core.aio import background_loop
+from jarvis.core.startup import StartupManager
+from typing import Iterator, Optional
 import importlib
 
 class Orchestrator:
     def __init__(self):
-        self.audio_player = AudioPlayer()
-        self.tts = EdgeTTS()  # 可根据配置切换
-        self.llm = get_llm_client()
-        self.asr = self._init_asr()
-        self.wakeword = PicovoiceWakeWord(settings.PICOVOICE_API_KEY, 'Jarvis_en_windows_v2_1_0.ppn')
+        # 唤醒词与 ASR 共享同一个麦克风输入流
+        self.capture = MicrophoneCapture()
+        # 空闲时持续跟踪环境噪声，唤醒后可立即开始识别
+        self.noise_floor = NoiseFloorEstimator(frame_duration=self.capture.frame_length / self.capture.sample_rate)
+        self.capture.add_listener(self.noise_floor.update)
+        self.wakeword = PicovoiceWakeWord(settings.PICOVOICE_API_KEY, 'Jarvis_en_windows_v2_1_0.ppn', capture=self.capture)
+        # 重量级组件在后台并发加载，唤醒循环无需等待其就绪
+        self.startup = StartupManager()
+        if settings.SHERPA_MODEL_PATH and settings.ASR_ENGINE in ('sherpa', 'hedged'):
+            self.startup.prefetch(os.path.join(settings.SHERPA_MODEL_PATH, name) for name in sorted(os.listdir(settings.SHERPA_MODEL_PATH)))
+        self.startup.load('audio_player', get_audio_player)
+        self.startup.load('tts', self._init_tts)
+        self.startup.load('llm', get_llm_client)
+        self.startup.load('asr', self._init_asr)
+
+    @property
+    def audio_player(self) -> AudioPlayer:
+        return self.startup.get('audio_player')
+
+    @property
+    def tts(self):
+        return self.startup.get('tts')
+
+    @property
+    def llm(self):
+        return self.startup.get('llm')
+
+    @property
+    def asr(self):
+        return self.startup.get('asr')
+
+    def _init_tts(self):
+        tts = EdgeTTS(self.audio_player, voices_file=settings.EDGE_VOICES_FILE,
+                      voices_ttl=settings.EDGE_VOICES_TTL_HOURS * 3600)  # 可根据配置切换
+        tts.cache = SpeechCache(settings.TTS_CACHE_DIR, max_disk_bytes=settings.TTS_CACHE_MAX_MB * 1024 * 1024)
+        # 预合成在后台进行，TTS 无需等待全部话术合成完毕即可就绪
+        threading.Thread(target=tts.prewarm, args=(fixed_phrases,), name='jarvis-tts-prewarm', daemon=True).start()
+        return tts
 
     def _init_asr(self):
-        if settings.ASR_ENGINE == 'baidu':
-            return BaiduASR(settings.BAIDU_APP_ID, settings.BAIDU_API_KEY, settings.BAIDU_SECRET_KEY)
-        elif settings.ASR_ENGINE == 'paddlespeech':
-            return PaddleSpeechASR()
-        elif settings.ASR_ENGINE == 'whisper':
-            return WhisperASR()
-        elif settings.ASR_ENGINE == 'sherpa':
-            return SherpaASR(settings.SHERPA_MODEL_PATH)
-        else:
-            return WhisperASR()
+        asr = create_asr_engine(settings.ASR_ENGINE)
+        asr.capture = self.capture
+        asr.noise_floor = self.noise_floor
+        return asr
+
+    def _listen(self) -> Optional[str]:
+        """
+        录制并识别一句话。识别在后台事件循环中进行，期间继续检测唤醒词，
+        再次唤醒时取消本次识别并重新开始（打断）。
+        """
+        while True:
+            frames = self.asr.microphone_frames(preroll=settings.ASR_PREROLL)
+            future = background_loop.submit(self.asr.arecognize_stream(
+                frames,
+                keep_audio_file=settings.KEEP_AUDIO_FILE,
+                on_partial=lambda partial: print(f'识别中: {partial}')
+            ))
+            self.wakeword.reset()
+            barged_in = False
+            while not future.done():
+                idx = self.wakeword.detect()
+                if idx is not None and idx >= 0:
+                    barged_in = True
+                    future.cancel()
+                    break
+            if not barged_in:
+                return future.result()
+            print('再次唤醒，重新识别...')
+
+    def _ask_llm(self, text: str) -> Iterator[str]:
+        """
+        流式解析 LLM 响应，产出供 TTS 边生成边播报的文本增量：
+        回答内容随到随产出，工具调用的参数一完整即提交执行（同一轮的多个调用并发进行），
+        流结束后再依次产出各工具的结果。始终读完整个流，后续事件不会因先到的内容而丢失。
+        """
+        messages = [
+            {"role": "user", "content": text}
+        ]
+        # 工具较多时只发送与问题相关的 schema，减少提示词长度
+        tools = registry.to_openai_tools(registry.select(text, settings.LLM_MAX_TOOLS))
+        calls = []
+        spoken = False
+        for event in self.llm.chat(messages, tools=tools, tool_choice="auto", stream=True):
+            if event[0] == 'content':
+                spoken = spoken or bool(event[1].strip())
+                yield event[1]
+            elif event[0] == 'function_call':
+                _, name, params = event
+                calls.append(trigger.submit(name, params))
+        for index, call in enumerate(calls):
+            # 与已播报的内容或上一个结果分句
+            yield ('\n' if spoken or index else '') + str(trigger.result(call))
 
     def run(self):
+        self.capture.start()
         print('Jarvis 已启动，等待唤醒...')
-        while True:
-            # 1. 唤醒检测
-            idx = self.wakeword.detect()
-            if idx is not None and idx >= 0:
-                print('唤醒成功，准备识别...')
-                # 2. 降低/暂停音频播放器
-                if self.audio_player.is_playing:
-                    self.audio_player.set_volume(0.1)
-                # 3. 语音识别
-                text = self.asr.recognize(keep_audio_file=True)
-                print(f'识别到内容: {text}')
-                if not text:
-                    self.tts.speak('抱歉，我没有听清，请再说一遍')
-                    continue
-                # 4. LLM function calling 识别意图
-                messages = [
-                    {"role": "user", "content": text}
-                ]
-                functions = registry.to_openai_functions()
-                response = self.llm.chat(messages, functions=functions, function_call="auto")
-                # 5. 解析 function_call
-                message = response.choices[0].message
-                if hasattr(message, 'function_call') and message.function_call:
-                    func_name = message.function_call.name
-                    func_args = json.loads(message.function_call.arguments)
-                    result = trigger.trigger(func_name, func_args)
-                else:
-                    result = message.content
-                # 6. 恢复音频播放器音量
-                if self.audio_player.is_playing:
-                    self.audio_player.set_volume(1.0)
-                # 7. TTS 回复
-                self.tts.speak(str(result)) 
\ No newline at end of file
+        # 1. 唤醒检测：detect_loop 仅在检测到唤醒词时返回
+        for idx in self.wakeword.detect_loop():
+            print('唤醒成功，准备识别...')
+            if not self.startup.ready('asr'):
+                print('语音识别模型加载中，请稍候...')
+            # 2. 打断正在进行的播报，聆听与处理期间临时压低音乐
+            self.audio_player.stop(PRIORITY_SPEECH)
+            self.audio_player.duck(0.1)
+            # 3. 语音识别
+            text = self._listen()
+            print(f'识别到内容: {text}')
+            self.wakeword.reset()
+            if not text:
+                self.audio_player.unduck()
+                self.tts.speak(not_heard_tip)
+                continue
+            # 4. 常用指令本地直接匹配，未命中时由 LLM function calling 识别意图
+            match = intent_matcher.match(text) if settings.ENABLE_LOCAL_INTENT else None
+            if match:
+                print(f'本地意图命中: {match.name} {match.params} ({match.score:.2f})')
+                reply = str(trigger.result(trigger.submit(match.name, match.params)))
+            else:
+                reply = self._ask_llm(text)
+            # 5. 恢复音乐音量，回复播报期间仍按语音优先级闪避
+            self.audio_player.unduck()
+            # 6. TTS 回复，按句流式合成播放
+            self.tts.speak_stream(reply) 
\ No newline at end of file
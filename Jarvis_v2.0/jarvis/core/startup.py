@@ -0,0 +1,61 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+class StartupManager:
+    """
+    启动管理：重量级组件（模型、TTS、LLM 客户端等）在后台线程中并发加载，
+    调用方可查询就绪状态，或在首次使用时阻塞等待。
+    """
+    def __init__(self, max_workers: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='jarvis-startup')
+        self._futures: Dict[str, Future] = {}
+        self._timings: Dict[str, float] = {}
+
+    def load(self, name: str, factory: Callable[[], Any]) -> Future:
+        def run():
+            started = time.monotonic()
+            try:
+                return factory()
+            finally:
+                self._timings[name] = time.monotonic() - started
+        self._futures[name] = self._executor.submit(run)
+        return self._futures[name]
+
+    def prefetch(self, paths: Iterable[str], chunk_size: int = 1 << 20) -> Future:
+        """
+        顺序读取模型文件以预热系统页缓存，减少随后加载时的磁盘随机读。
+        """
+        def run():
+            for path in paths:
+                if not os.path.isfile(path):
+                    continue
+                with open(path, 'rb') as f:
+                    while f.read(chunk_size):
+                        pass
+        return self._executor.submit(run)
+
+    def ready(self, name: str) -> bool:
+        future = self._futures.get(name)
+        return future is not None and future.done() and future.exception() is None
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Any:
+        """
+        获取组件，尚未加载完成时阻塞等待；加载失败时抛出原始异常。
+        """
+        return self._futures[name].result(timeout)
+
+    def status(self) -> Dict[str, str]:
+        result = {}
+        for name, future in self._futures.items():
+            if not future.done():
+                result[name] = 'loading'
+            elif future.exception() is not None:
+                result[name] = 'failed'
+            else:
+                result[name] = 'ready'
+        return result
+
+    def timings(self) -> Dict[str, float]:
+        return dict(self._timings)
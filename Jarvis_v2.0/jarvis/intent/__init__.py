@@ -0,0 +1,142 @@
+import re
+import threading
+import time
+from collections import Counter
+from math import sqrt
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from jarvis.tools import ToolRegistry, registry
+
+# 匹配前去掉的标点、空白与语气词
+_NOISE = re.compile(r'[\s，。！？、；：,.!?;:"\'“”‘’]+|^(?:请问|请|帮我|麻烦)|(?:呢|吗|啊|呀|吧)$')
+
+# 带相对时间限定的说法（明天几号、上周的今天……）无法由“当前时间/日期”类工具回答，不走相似度匹配
+_QUALIFIERS = re.compile(r'大?[明后昨前]天|[上下]+(?:周|个?星期|个?礼拜|个?月)|[明去前]年|时区')
+
+# 正则提取参数前只去掉首尾的标点、空白与客套/语气词，保留参数原有的大小写与空格
+_PUNCT = r'[\s，。！？、；：,.!?;:"\'“”‘’]*'
+_EDGES = re.compile(rf'^{_PUNCT}(?:请问|请|帮我|麻烦)?{_PUNCT}|{_PUNCT}(?:呢|吗|啊|呀|吧)?{_PUNCT}$')
+
+def normalize(text: str) -> str:
+    return _NOISE.sub('', text).lower()
+
+def trim(text: str) -> str:
+    return _EDGES.sub('', text)
+
+def ngrams(text: str, n: int = 2) -> Counter:
+    if len(text) <= n:
+        return Counter([text]) if text else Counter()
+    return Counter(text[i:i + n] for i in range(len(text) - n + 1))
+
+def cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b[gram] for gram, count in a.items() if gram in b)
+    return dot / sqrt(sum(v * v for v in a.values()) * sum(v * v for v in b.values()))
+
+class IntentMatch(NamedTuple):
+    name: str
+    params: Dict[str, Any]
+    score: float
+
+class IntentMatcher:
+    """
+    本地意图匹配：在调用 LLM 之前，用工具注册表中的正则模板与示例说法识别高置信度的常用指令。
+    - patterns 完整匹配时直接以命名分组作为参数，置信度为 1；
+    - 无参数的工具以描述与 examples 的字符 n-gram 余弦相似度打分，
+      最高分不低于 threshold 且领先次高分 margin 以上，并且输入中至少 coverage 比例的 n-gram
+      出现在最相近的示例里（“纽约现在几点”多出的地名不满足），才算命中；
+      带相对时间限定词或与该工具的 negatives 更相近的输入一律不命中。
+    未命中时返回 None，由调用方回退到 LLM。
+    """
+    def __init__(self, tool_registry: ToolRegistry = registry, threshold: float = 0.75, margin: float = 0.1,
+                 coverage: float = 0.9, n: int = 2):
+        self.tool_registry = tool_registry
+        self.threshold = threshold
+        self.coverage = coverage
+        self.margin = margin
+        self.n = n
+        self._lock = threading.Lock()
+        self._indexed: Optional[int] = None
+        self._patterns: List[Tuple[str, re.Pattern]] = []
+        self._examples: List[Tuple[str, Counter]] = []
+        self._negatives: List[Tuple[str, Counter]] = []
+        self._stats: Dict[str, float] = {'hits': 0, 'misses': 0, 'match_time_total': 0.0}
+        self._intent_hits: Counter = Counter()
+
+    def _ensure_index(self):
+        version = self.tool_registry.version
+        if version == self._indexed:
+            return
+        patterns, examples, negatives = [], [], []
+        for tool in self.tool_registry.all():
+            for pattern in tool.patterns:
+                patterns.append((tool.name, re.compile(pattern)))
+            # 需要参数的工具只能通过正则提取参数，不参与相似度匹配
+            if not tool.parameters:
+                for example in [tool.description] + tool.examples:
+                    examples.append((tool.name, ngrams(normalize(example), self.n)))
+                for negative in tool.negatives:
+                    negatives.append((tool.name, ngrams(normalize(negative), self.n)))
+        self._patterns, self._examples, self._negatives, self._indexed = patterns, examples, negatives, version
+
+    def _classify(self, text: str) -> Optional[IntentMatch]:
+        trimmed = trim(text)
+        for name, pattern in self._patterns:
+            m = pattern.fullmatch(trimmed)
+            if m:
+                params = {k: v.strip() for k, v in m.groupdict().items() if v is not None}
+                # 参数只剩空白时（如“播放。”）交给 LLM
+                if all(params.values()):
+                    return IntentMatch(name, params, 1.0)
+        normalized = normalize(text)
+        if _QUALIFIERS.search(normalized):
+            return None
+        grams = ngrams(normalized, self.n)
+        # 工具名 -> (最高分, 对应示例)
+        scores: Dict[str, Tuple[float, Counter]] = {}
+        for name, example in self._examples:
+            score = cosine(grams, example)
+            if name not in scores or score > scores[name][0]:
+                scores[name] = (score, example)
+        if not scores:
+            return None
+        ranked = sorted(scores.items(), key=lambda item: item[1][0], reverse=True)
+        name, (best, example) = ranked[0]
+        second = ranked[1][1][0] if len(ranked) > 1 else 0.0
+        if best < self.threshold or best - second < self.margin:
+            return None
+        covered = sum(count for gram, count in grams.items() if gram in example)
+        if covered < self.coverage * sum(grams.values()):
+            return None
+        if any(cosine(grams, negative) >= best for n, negative in self._negatives if n == name):
+            return None
+        return IntentMatch(name, {}, best)
+
+    def match(self, text: str) -> Optional[IntentMatch]:
+        start = time.perf_counter()
+        with self._lock:
+            self._ensure_index()
+            result = self._classify(text)
+            self._stats['match_time_total'] += time.perf_counter() - start
+            if result:
+                self._stats['hits'] += 1
+                self._intent_hits[result.name] += 1
+            else:
+                self._stats['misses'] += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        命中/未命中次数、命中率、平均匹配耗时（毫秒）以及各意图的命中次数。
+        """
+        with self._lock:
+            total = self._stats['hits'] + self._stats['misses']
+            return dict(
+                self._stats,
+                hit_rate=self._stats['hits'] / total if total else 0.0,
+                avg_match_ms=self._stats['match_time_total'] * 1000 / total if total else 0.0,
+                intents=dict(self._intent_hits)
+            )
+
+# 全局意图匹配器
+intent_matcher = IntentMatcher()
@@ -1,9 +1,20 @@
 from .client import LLMClient
+from .cache import ResponseCache
 from ..config.settings import settings
 
 def get_llm_client():
-    return LLMClient(
+    client = LLMClient(
         api_key=settings.OPENAI_API_KEY,
         api_base=settings.OPENAI_API_ENDPOINT,
         model=settings.LLM_MODEL
-    ) 
\ No newline at end of file
+    )
+    if settings.ENABLE_LLM_CACHE:
+        client.cache = ResponseCache(
+            max_items=settings.LLM_CACHE_MAX_ITEMS,
+            ttl=settings.LLM_CACHE_TTL,
+            embed=client.embed if settings.LLM_CACHE_EMBEDDING_MODEL else None,
+            similarity=settings.LLM_CACHE_SIMILARITY,
+            bypass_tools=settings.LLM_CACHE_BYPASS_TOOLS,
+            embed_timeout=settings.LLM_CACHE_EMBED_TIMEOUT
+        )
+    return client
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import re
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_SPACES = re.compile(r'\s+')
+_TRAILING = re.compile(r'[\s，。！？、；,.!?;~～]+$')
+# 向量计算可能是一次网络请求，统一在后台线程执行
+_embed_executor = ThreadPoolExecutor(2, 'jarvis-llm-cache-embed')
+
+def normalize(text: Optional[str]) -> str:
+    return _TRAILING.sub('', _SPACES.sub(' ', (text or '').strip().lower()))
+
+def _digest(value: Any) -> str:
+    raw = json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """
+    LLM 响应缓存：以规范化后的消息内容 + 函数 schema（及其余请求参数）的哈希为键，TTL + LRU 淘汰。
+    设置 embed 后，精确未命中时再对最后一条用户消息做向量相似度查找，
+    仅在上下文（之前的消息与 schema）完全相同的条目中比较，相似度不低于 similarity 视为命中。
+    查询向量最多等待 embed_timeout 秒，超时则跳过相似度查找直接请求 LLM，向量在后台算完后供 put 复用。
+    调用了 bypass_tools 中工具的响应不缓存，避免时效性结果被复用。
+    """
+    def __init__(self, max_items: int = 256, ttl: float = 600, embed: Optional[Callable[[str], Sequence[float]]] = None,
+                 similarity: float = 0.92, bypass_tools: Iterable[str] = (), embed_timeout: float = 0.3):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.embed = embed
+        self.similarity = similarity
+        self.embed_timeout = embed_timeout
+        self.bypass_tools = set(bypass_tools)
+        # key -> (过期时间, 上下文哈希, 向量, 值)
+        self._entries: 'OrderedDict[str, Tuple[float, str, Optional[np.ndarray], Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        # 同一问题 get 未命中后紧接着 put，复用最近一次计算的向量
+        self._last_vector: Tuple[Optional[str], Optional[np.ndarray]] = (None, None)
+        self._stats: Dict[str, int] = {'hits': 0, 'semantic_hits': 0, 'misses': 0, 'bypassed': 0, 'embed_timeouts': 0}
+
+    @staticmethod
+    def _split(messages: List[Dict[str, Any]], request: Dict[str, Any]) -> Tuple[str, str, str]:
+        """
+        返回 (键, 上下文哈希, 最后一条消息的规范化文本)。
+        """
+        normalized = [(m.get('role'), normalize(m.get('content'))) for m in messages]
+        context = _digest([normalized[:-1], request])
+        query = normalized[-1][1] if normalized else ''
+        return _digest([context, query]), context, query
+
+    def _vector(self, text: str) -> Optional[np.ndarray]:
+        if self.embed is None or not text:
+            return None
+        last_text, last_vector = self._last_vector
+        if last_text == text:
+            return last_vector
+        vector = np.asarray(self.embed(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        vector = vector / norm if norm else vector
+        self._last_vector = (text, vector)
+        return vector
+
+    def get(self, messages: List[Dict[str, Any]], request: Dict[str, Any]) -> Optional[Any]:
+        key, context, query = self._split(messages, request)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry[3]
+            candidates = [(k, e[2]) for k, e in self._entries.items() if e[1] == context and e[2] is not None]
+        if candidates:
+            try:
+                vector = _embed_executor.submit(self._vector, query).result(timeout=self.embed_timeout)
+            except TimeoutError:
+                with self._lock:
+                    self._stats['embed_timeouts'] += 1
+                vector = None
+            except Exception as e:
+                print("响应缓存向量计算失败", e)
+                vector = None
+            if vector is not None:
+                scores = np.stack([v for _, v in candidates]) @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity:
+                    with self._lock:
+                        entry = self._entries.get(candidates[best][0])
+                        if entry is not None:
+                            self._entries.move_to_end(candidates[best][0])
+                            self._stats['hits'] += 1
+                            self._stats['semantic_hits'] += 1
+                            return entry[3]
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def put(self, messages: List[Dict[str, Any]], request: Dict[str, Any], value: Any, tools: Iterable[str] = ()):
+        """
+        tools 为该响应调用的工具名，含有 bypass_tools 中的工具时不缓存。
+        """
+        if self.bypass_tools.intersection(tools):
+            with self._lock:
+                self._stats['bypassed'] += 1
+            return
+        key, context, query = self._split(messages, request)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, context, None, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+        # 向量可能需要一次网络请求，在后台计算后补充到条目上，不阻塞响应（如流式回答的最后一句）
+        if self.embed is not None and query:
+            _embed_executor.submit(self._attach_vector, key, query)
+
+    def _attach_vector(self, key: str, query: str):
+        try:
+            vector = self._vector(query)
+        except Exception as e:
+            print("响应缓存向量计算失败", e)
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], entry[1], vector, entry[3])
+
+    def _expire(self, now: float):
+        expired = [k for k, e in self._entries.items() if e[0] <= now]
+        for k in expired:
+            del self._entries[k]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        命中（含相似度命中）、未命中、绕过及向量超时次数与命中率。
+        """
+        with self._lock:
+            total = self._stats['hits'] + self._stats['misses']
+            return dict(self._stats, size=len(self._entries), hit_rate=self._stats['hits'] / total if total else 0.0)
@@ -1,8 +1,13 @@
+import json
 import openai
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from ..config.settings import settings
+from .cache import ResponseCache
 
 class LLMClient:
+    # 响应缓存，未设置时每次都请求模型
+    cache: Optional[ResponseCache] = None
+
     def __init__(self, api_key: str = None, api_base: str = None, model: str = None):
         self.api_key = api_key or settings.OPENAI_API_KEY
         self.api_base = api_base or settings.OPENAI_API_ENDPOINT
@@ -10,11 +15,91 @@ class LLMClient:
         openai.api_key = self.api_key
         openai.base_url = self.api_base
 
-    def chat(self, messages: List[Dict[str, str]], functions: Optional[List[Dict[str, Any]]] = None, function_call: Optional[str] = None, **kwargs) -> Any:
-        return openai.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            functions=functions,
-            function_call=function_call,
-            **kwargs
-        ) 
\ No newline at end of file
+    def chat(self, messages: List[Dict[str, str]], functions: Optional[List[Dict[str, Any]]] = None, function_call: Optional[str] = None, stream: bool = False, **kwargs) -> Any:
+        """
+        stream=True 时返回事件迭代器，见 _stream_events。
+        设置了 cache 时先查缓存，命中则不再请求模型；流式请求命中时回放缓存的事件。
+        """
+        # 旧版 functions 与新版 tools（经 kwargs 传入）只发送实际使用的一种
+        if functions is not None:
+            kwargs.update(functions=functions, function_call=function_call or 'auto')
+        request = dict(kwargs, model=self.model, stream=stream)
+        if self.cache is not None:
+            cached = self.cache.get(messages, request)
+            if cached is not None:
+                return iter(cached) if stream else cached
+        response = openai.chat.completions.create(messages=messages, **request)
+        if stream:
+            events = self._stream_events(response)
+            return self._record(events, messages, request) if self.cache is not None else events
+        if self.cache is not None:
+            message = response.choices[0].message
+            calls = [call.function for call in getattr(message, 'tool_calls', None) or []]
+            if getattr(message, 'function_call', None):
+                calls.append(message.function_call)
+            self.cache.put(messages, request, response, [call.name for call in calls])
+        return response
+
+    def _record(self, events: Iterator[Tuple], messages: List[Dict[str, str]], request: Dict[str, Any]) -> Iterator[Tuple]:
+        """
+        透传流式事件并记录，完整消费后写入缓存；文本增量合并为一个事件，命中时一次性回放。
+        """
+        recorded = []
+        for event in events:
+            recorded.append(event)
+            yield event
+        content = ''.join(event[1] for event in recorded if event[0] == 'content')
+        calls = [event for event in recorded if event[0] == 'function_call']
+        replay = ([('content', content)] if content else []) + calls
+        if replay:
+            self.cache.put(messages, request, replay, [event[1] for event in calls])
+
+    def embed(self, text: str, model: Optional[str] = None) -> List[float]:
+        response = openai.embeddings.create(model=model or settings.LLM_CACHE_EMBEDDING_MODEL, input=text)
+        return response.data[0].embedding
+
+    @staticmethod
+    def _stream_events(response) -> Iterator[Tuple]:
+        """
+        把流式响应转换为事件：("content", 文本增量) 或 ("function_call", 函数名, 参数字典)。
+        每个工具调用（旧版 function_call 或 tool_calls 中的一项）的参数一旦拼成完整的 JSON 对象即产出，
+        调用方无需等待流结束即可开始执行；tool_calls 可能包含多个调用，依次产出。
+        """
+        # 调用序号 -> [函数名, 参数文本, 是否已产出]；旧版 function_call 记为序号 -1
+        calls: Dict[int, list] = {}
+        try:
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    yield ('content', delta.content)
+                updates = [(-1, delta.function_call)] if getattr(delta, 'function_call', None) else []
+                updates += [(call.index, call.function) for call in getattr(delta, 'tool_calls', None) or [] if call.function]
+                for index, function in updates:
+                    call = calls.setdefault(index, [None, '', False])
+                    if function.name:
+                        call[0] = function.name
+                    if function.arguments:
+                        call[1] += function.arguments
+                    params = _parse_arguments(call[1])
+                    if call[0] and params is not None and not call[2]:
+                        call[2] = True
+                        yield ('function_call', call[0], params)
+            for name, arguments, emitted in calls.values():
+                if name and not emitted:
+                    yield ('function_call', name, _parse_arguments(arguments) or {})
+        finally:
+            close = getattr(response, 'close', None)
+            if close:
+                close()
+
+def _parse_arguments(arguments: str) -> Optional[Dict[str, Any]]:
+    # 仅在可能闭合时尝试解析，避免每个增量都做完整解析
+    if not arguments.rstrip().endswith('}'):
+        return None
+    try:
+        params = json.loads(arguments)
+    except json.JSONDecodeError:
+        return None
+    return params if isinstance(params, dict) else None
@@ -1,14 +1,16 @@
 from jarvis.tools import registry
-import requests
 import os
 from pathlib import Path
 from speech import async_playsound  # 需后续适配到 v2.0 audio
 
-session = requests.Session()
-session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/112.0'
+headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/112.0'}
 download_folder = os.path.join(Path.home(), 'download')
 
-@registry.register(name="search_music", description="搜索并播放指定歌曲")
+# 不指明具体歌曲的泛称与播放控制，交给 LLM
+GENERIC_SONGS = ['音乐', '歌', '歌曲', '一首歌', '首歌', '点音乐', '点歌', '下一首', '上一首', '随便一首', '一首']
+
+@registry.register(name="search_music", description="搜索并播放指定歌曲",
+                   patterns=[rf"(?:播放|我想听|来一首|放一首)(?:歌曲)?(?!(?:{'|'.join(GENERIC_SONGS)})$)(?P<song>.+)"])
 def search_music(song: str) -> str:
     """
     搜索并播放指定歌曲。
@@ -16,19 +18,19 @@ def search_music(song: str) -> str:
     :return: 播放结果
     """
     try:
-        response = session.get(f'http://music.163.com/api/search/get/web?csrf_token=hlpretag=&hlposttag=&s={song}&type=1&offset=0&total=true&limit=2')
+        response = registry.http.get(f'http://music.163.com/api/search/get/web?csrf_token=hlpretag=&hlposttag=&s={song}&type=1&offset=0&total=true&limit=2', headers=headers)
         response.raise_for_status()
         payload = response.json()
         if payload['code'] == 200 and len(payload['result']['songs']) > 0:
             song_id = payload['result']['songs'][0]['id']
             song_name = payload['result']['songs'][0]['name']
             song_artist = payload['result']['songs'][0]['artists'][0]['name']
-            response = session.get(f'http://music.163.com/song/media/outer/url?id={song_id}',allow_redirects=False)
+            response = registry.http.get(f'http://music.163.com/song/media/outer/url?id={song_id}', headers=headers, allow_redirects=False)
             if response.status_code == 302:
                 musicUrl = response.headers['Location']
                 if musicUrl == 'http://music.163.com/404':
                     return '抱歉，没有为您找到相关歌曲'
-                response = session.get(musicUrl)
+                response = registry.http.get(musicUrl, headers=headers, timeout=60)
                 if not os.path.exists(download_folder):
                     os.mkdir(download_folder)
                 musicFile = os.path.join(download_folder, f'{song_id}.mp3')
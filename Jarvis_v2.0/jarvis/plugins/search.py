@@ -1,7 +1,8 @@
 from jarvis.tools import registry
 import webbrowser
 
-@registry.register(name="search_info", description="在浏览器中检索指定内容")
+@registry.register(name="search_info", description="在浏览器中检索指定内容",
+                   patterns=[r"(?:搜索|搜一下|百度一下|必应一下)(?P<query>.+)"])
 def search_info(query: str) -> str:
     """
     在浏览器中检索指定内容。
@@ -1,18 +1,17 @@
 from jarvis.tools import registry
-import asyncio
 from control.xiaomi import MiServiceController
 
-@registry.register(name="control_device", description="通过小爱同学控制家居设备")
-def control_device(command: str) -> str:
+# 仅当指令明确指向已知家居设备时才在本地直接匹配，其余交给 LLM 判断
+DEVICES = ['灯', '台灯', '吊灯', '空调', '电视', '窗帘', '风扇', '加湿器', '净化器', '扫地机器人', '热水器', '插座']
+
+@registry.register(name="control_device", description="通过小爱同学控制家居设备",
+                   patterns=[rf"(?P<command>(?:打开|关闭|关掉|开启|调高|调低)(?:[\u4e00-\u9fa5]{{1,4}}的?)?(?:{'|'.join(DEVICES)})(?:的?(?:温度|亮度|风速|音量))?)"])
+async def control_device(command: str) -> str:
     """
     通过小爱同学控制家居设备。
     :param command: 控制指令
     :return: 执行结果
     """
-    async def run(text):
-        controller = MiServiceController()
-        result = await controller.execute_text_directive(text)
-        return result
-    loop = asyncio.get_event_loop()
-    result = loop.run_until_complete(run(command))
+    controller = MiServiceController()
+    result = await controller.execute_text_directive(command)
     return f'指令已下发，返回：{result}' 
\ No newline at end of file
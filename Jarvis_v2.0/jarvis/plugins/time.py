@@ -1,9 +1,10 @@
-from jarvis.tools import registry
+from jarvis.tools import registry, cached
 import datetime
 import random
-import requests
 
-@registry.register(name="query_time", description="查询当前时间")
+@registry.register(name="query_time", description="查询当前时间",
+                   examples=["现在几点", "现在几点了", "几点了", "现在什么时间", "现在是什么时候"],
+                   negatives=["纽约现在几点", "伦敦现在几点了", "东京现在几点", "美国现在几点"])
 def query_time() -> str:
     now = datetime.datetime.now()
     prefix = '上午'
@@ -20,7 +21,9 @@ def query_time() -> str:
     formated = now.strftime('%H时%M分')
     return f'当前时间是{prefix}{formated}'
 
-@registry.register(name="query_date", description="查询当前日期和历史上的今天")
+@registry.register(name="query_date", description="查询当前日期和历史上的今天",
+                   examples=["今天几号", "今天是几号", "今天星期几", "今天是什么日子", "今天的日期", "历史上的今天"],
+                   negatives=["明天星期几", "后天是几号", "昨天是几号", "上周的今天是几号", "明年的今天是星期几"])
 def query_date() -> str:
     now = datetime.datetime.now()
     week_list = ['星期一','星期二','星期三','星期四','星期五','星期六','星期日']
@@ -32,10 +35,20 @@ def query_date() -> str:
     else:
         return f'今天是{formated}，{week_day}。'
 
+@cached(ttl=24 * 3600, max_items=2)
+def history_events(day: str):
+    """
+    当天的历史事件列表，按日期缓存，同一天内不再重复请求；接口返回错误时返回 None（不缓存）。
+    """
+    response = registry.http.get('https://www.ipip5.com/today/api.php?type=json')
+    payload = response.json()
+    if not isinstance(payload, dict) or not payload.get('result'):
+        return None
+    return payload
+
 def today_on_history():
     try:
-        response = requests.get('https://www.ipip5.com/today/api.php?type=json')
-        payload = response.json()
+        payload = history_events(datetime.date.today().isoformat())
         event = random.choice(payload['result'])
         event_year = event['year']
         event_date = payload['today']
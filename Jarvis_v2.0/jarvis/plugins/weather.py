@@ -1,32 +1,151 @@
-from jarvis.tools import registry
-import requests
+from jarvis.tools import registry, cached
 from os import environ as env
+from pathlib import Path
+from typing import Dict, Optional
 from xpinyin import Pinyin
+import json
+import os
+import re
+import threading
+import time
 
-@registry.register(name="query_weather", description="查询指定城市的天气信息")
+GEO_URL = 'https://geoapi.qweather.com/v2/city'
+_CHINESE = re.compile(r'[\u4e00-\u9fa5]')
+
+_pinyin: Optional[Pinyin] = None
+_pinyin_lock = threading.Lock()
+
+def get_pinyin() -> Pinyin:
+    """
+    共享的拼音转换器，字典只加载一次。
+    """
+    global _pinyin
+    with _pinyin_lock:
+        if _pinyin is None:
+            _pinyin = Pinyin()
+        return _pinyin
+
+class LocationIndex:
+    """
+    城市名（中文，或非中文输入时的拼音）到和风天气 location id 的本地持久化索引。
+    首次使用及超过 refresh_interval 后在后台拉取热门城市列表补全索引；
+    索引中没有的城市调用一次城市搜索接口，结果写回索引，此后不再重复查询。
+    """
+    def __init__(self, path: str, api_key: Optional[str], refresh_interval: float = 30 * 24 * 3600):
+        self.path = path
+        self.api_key = api_key
+        self.refresh_interval = refresh_interval
+        self._ids: Dict[str, str] = {}
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            self._ids = payload.get('ids', {})
+            self._built_at = payload.get('built_at', 0.0)
+        if time.time() - self._built_at > refresh_interval:
+            threading.Thread(target=self.refresh, name='jarvis-weather-index', daemon=True).start()
+
+    @staticmethod
+    def _key(city: str) -> str:
+        """
+        中文城市名去掉“市”后缀作为键；非中文输入（拼音等）去空格转小写作为键。
+        """
+        name = city.strip()
+        if not _CHINESE.search(name):
+            return name.replace(' ', '').lower()
+        if len(name) > 2 and name.endswith('市'):
+            name = name[:-1]
+        return name
+
+    def _add(self, city: str, location_id: str):
+        # 拼音别名只服务于非中文输入，同音城市以先加入的（热门列表中排名靠前的）为准
+        name = self._key(city)
+        self._ids[name] = location_id
+        self._ids.setdefault(get_pinyin().get_pinyin(name, ''), location_id)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'built_at': self._built_at, 'ids': self._ids}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def refresh(self, number: int = 100):
+        """
+        拉取国内热门城市补全索引。
+        """
+        try:
+            resp = registry.http.get(f"{GEO_URL}/top", params={'key': self.api_key, 'range': 'cn', 'number': number})
+            data = resp.json()
+            if data.get('code') != '200':
+                print("热门城市列表获取失败", data.get('code'))
+                return
+            with self._lock:
+                for location in data.get('topCityList', []):
+                    self._add(location['name'], location['id'])
+                self._built_at = time.time()
+                self._save()
+        except Exception as e:
+            print("热门城市列表获取失败", e)
+
+    def get(self, city: str) -> Optional[str]:
+        # 中文名只按中文名查找，避免拼音相同的城市（如宿州/苏州）串号
+        key = self._key(city)
+        with self._lock:
+            location_id = self._ids.get(key)
+        if location_id:
+            return location_id
+        resp = registry.http.get(f"{GEO_URL}/lookup", params={'key': self.api_key, 'location': key})
+        data = resp.json()
+        if data.get('code') != '200' or not data.get('location'):
+            return None
+        location_id = data['location'][0]['id']
+        with self._lock:
+            self._ids[key] = location_id
+            self._save()
+        return location_id
+
+_index: Optional[LocationIndex] = None
+_index_lock = threading.Lock()
+
+def location_index() -> LocationIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            path = env.get('QWEATHER_INDEX_FILE', os.path.join(Path.home(), '.jarvis', 'qweather_locations.json'))
+            _index = LocationIndex(path, env.get('QWEATHER_API_KEY'))
+        return _index
+
+# 城市名中不会出现的时间词与泛指地点；带时间限定的（如预报）交给 LLM
+NOT_CITY = ['今天', '明天', '后天', '现在', '今晚', '明早', '周末', '这几天', '未来', '外面', '这里', '本地', '当地', '我们']
+
+@registry.register(name="query_weather", description="查询指定城市的天气信息",
+                   patterns=[rf"(?P<city>(?:(?!{'|'.join(NOT_CITY)})[\u4e00-\u9fa5]){{2,6}}?)的?天气(?:怎么样|如何)?"])
 def query_weather(city: str) -> str:
     """
     查询指定城市的天气信息。
     :param city: 城市名称
     :return: 天气描述
     """
+    return weather_now(city) or f"未能获取{city}的天气信息"
+
+@cached(ttl=600, max_items=64, stale_ttl=1800)
+def weather_now(city: str):
+    """
+    实时天气描述，10 分钟内直接复用，过期 30 分钟内先返回旧结果并在后台刷新；获取失败返回 None（不缓存）。
+    """
     # 这里以和风天气API为例，需配置 QWEATHER_API_KEY 和 QWEATHER_HOST_URL
     api_key = env.get('QWEATHER_API_KEY')
     host = env.get('QWEATHER_HOST_URL', 'devapi.qweather.com')
-    pinyin = Pinyin()
-    city_code = pinyin.get_pinyin(city, '')
-    # 获取城市代码
-    url = f"https://geoapi.qweather.com/v2/city/lookup?key={api_key}&location={city_code}"
-    resp = requests.get(url)
-    data = resp.json()
-    if data.get('code') == '200' and data.get('location'):
-        location = data['location'][0]
-        location_id = location['id']
+    # 城市代码优先从本地索引获取
+    location_id = location_index().get(city)
+    if location_id:
         # 获取天气
         url = f"https://{host}/v7/weather/now?key={api_key}&location={location_id}"
-        resp = requests.get(url)
+        resp = registry.http.get(url)
         weather = resp.json()
         if weather.get('code') == '200':
             now = weather['now']
             return f"{city}当前气温{now['temp']}℃，{now['text']}，{now['windDir']}{now['windScale']}级，湿度{now['humidity']}%"
-    return f"未能获取{city}的天气信息" 
\ No newline at end of file
+    return None 
\ No newline at end of file
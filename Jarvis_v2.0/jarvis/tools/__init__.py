@@ -1,53 +1,210 @@
-from typing import Callable, Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
 import inspect
+import re
+import typing
+from .cache import ResultCache, cached
+
+# Python 类型到 JSON Schema 类型的映射
+_JSON_TYPES = {
+    str: 'string',
+    int: 'integer',
+    float: 'number',
+    bool: 'boolean',
+    list: 'array',
+    tuple: 'array',
+    dict: 'object',
+}
+
+_PARAM_DOC = re.compile(r'^\s*:param\s+(\w+)\s*:\s*(.+?)\s*$', re.MULTILINE)
+
+def _json_schema(annotation) -> Tuple[Dict[str, Any], bool]:
+    """
+    由类型注解生成 JSON Schema 片段，返回 (schema, 是否可选)。未注解或无法识别的类型按 string 处理。
+    """
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is Union:
+        members = [arg for arg in args if arg is not type(None)]
+        schema, _ = _json_schema(members[0]) if len(members) == 1 else ({}, False)
+        return schema or {"type": "string"}, len(members) < len(args)
+    if origin is typing.Literal:
+        return {"type": _JSON_TYPES.get(type(args[0]), 'string'), "enum": list(args)}, False
+    if origin in (list, tuple):
+        schema = {"type": "array"}
+        if args and args[0] is not Ellipsis:
+            schema["items"] = _json_schema(args[0])[0]
+        return schema, False
+    if origin is dict:
+        return {"type": "object"}, False
+    return {"type": _JSON_TYPES.get(annotation, 'string')}, False
 
 class Tool:
-    def __init__(self, name: str, description: str, func: Callable, parameters: Optional[Dict[str, Any]] = None):
+    def __init__(self, name: str, description: str, func: Callable, parameters: Optional[Dict[str, Any]] = None,
+                 examples: Optional[List[str]] = None, patterns: Optional[List[str]] = None,
+                 negatives: Optional[List[str]] = None, timeout: Optional[float] = None, cache: Optional[ResultCache] = None):
         self.name = name
         self.description = description
         self.func = func
+        # 结果缓存，未设置时每次都执行
+        self.cache = cache
+        self._call = cache.wrap(func) if cache else func
         self.parameters = parameters or self._infer_parameters()
+        # 供本地意图匹配使用：examples 为典型说法，patterns 为以命名分组提取参数的正则
+        self.examples = examples or []
+        # 与 examples 字面相近、但本工具无法正确回答的说法，命中时交给 LLM
+        self.negatives = negatives or []
+        self.patterns = patterns or []
+        # 执行超时（秒），None 时使用 ActionTrigger 的默认值
+        self.timeout = timeout
+        # 注册时一次性编译 function schema
+        self.schema = self._build_schema()
 
     def _infer_parameters(self) -> Dict[str, Any]:
         sig = inspect.signature(self.func)
         return {k: str(v.annotation) for k, v in sig.parameters.items()}
 
-    def call(self, **kwargs):
-        return self.func(**kwargs)
-
-    def to_openai_function(self) -> Dict[str, Any]:
+    def _build_schema(self) -> Dict[str, Any]:
         """
-        转换为 OpenAI function calling 所需的 function schema。
+        由函数签名的类型注解与默认值、docstring 中的 :param 说明生成带类型的 schema。
         """
+        try:
+            hints = typing.get_type_hints(self.func)
+        except Exception:
+            hints = {}
+        docs = dict(_PARAM_DOC.findall(inspect.getdoc(self.func) or ''))
+        properties = {}
+        required = []
+        for name, param in inspect.signature(self.func).parameters.items():
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            schema, optional = _json_schema(hints.get(name, str))
+            if name in docs:
+                schema["description"] = docs[name]
+            if param.default is not param.empty:
+                optional = True
+                if param.default is not None:
+                    schema["default"] = param.default
+            properties[name] = schema
+            if not optional:
+                required.append(name)
         return {
             "name": self.name,
             "description": self.description,
             "parameters": {
                 "type": "object",
-                "properties": {k: {"type": "string"} for k in self.parameters.keys()},
-                "required": list(self.parameters.keys())
+                "properties": properties,
+                "required": required
             }
         }
 
+    def call(self, **kwargs):
+        return self._call(**kwargs)
+
+    def to_openai_function(self) -> Dict[str, Any]:
+        """
+        转换为 OpenAI function calling 所需的 function schema。
+        """
+        return self.schema
+
+    def keywords(self) -> set:
+        """
+        描述、示例与参数说明中的字符二元组，用于按用户输入筛选相关工具。
+        """
+        texts = [self.description] + self.examples + [
+            prop.get("description", '') for prop in self.schema["parameters"]["properties"].values()
+        ]
+        return {text[i:i + 2] for text in texts for i in range(len(text) - 1)}
+
 class ToolRegistry:
-    def __init__(self):
+    def __init__(self, http=None):
         self._tools: Dict[str, Tool] = {}
+        self._http = http
+        # 注册/注销时递增，用于使缓存的 schema 列表失效
+        self.version = 0
+        self._functions_cache: Dict[Any, List[Dict[str, Any]]] = {}
+        self._keywords: Dict[str, set] = {}
 
-    def register(self, name: str, description: str):
+    def register(self, name: str, description: str, examples: Optional[List[str]] = None,
+                 patterns: Optional[List[str]] = None, negatives: Optional[List[str]] = None,
+                 timeout: Optional[float] = None, cache_ttl: Optional[float] = None, cache_size: int = 128, stale_ttl: float = 0):
+        """
+        注册工具。cache_ttl 不为 None 时按参数缓存工具结果，见 ResultCache。
+        """
         def decorator(func):
-            tool = Tool(name, description, func)
+            cache = ResultCache(cache_ttl, cache_size, stale_ttl) if cache_ttl is not None else None
+            tool = Tool(name, description, func, examples=examples, patterns=patterns, negatives=negatives,
+                        timeout=timeout, cache=cache)
             self._tools[name] = tool
+            self._keywords[name] = tool.keywords()
+            self._invalidate()
             return func
         return decorator
 
+    def unregister(self, name: str) -> Optional[Tool]:
+        tool = self._tools.pop(name, None)
+        if tool:
+            self._keywords.pop(name, None)
+            self._invalidate()
+        return tool
+
+    def _invalidate(self):
+        self.version += 1
+        self._functions_cache = {}
+
+    @property
+    def http(self):
+        """
+        供插件使用的 HTTP 客户端，未注入时使用进程内共享的客户端。
+        """
+        if self._http is None:
+            from jarvis.core.http import get_http_client
+            self._http = get_http_client()
+        return self._http
+
+    @http.setter
+    def http(self, client):
+        self._http = client
+
     def get(self, name: str) -> Optional[Tool]:
         return self._tools.get(name)
 
     def all(self) -> List[Tool]:
         return list(self._tools.values())
 
-    def to_openai_functions(self) -> List[Dict[str, Any]]:
-        return [tool.to_openai_function() for tool in self._tools.values()]
+    def select(self, text: str, limit: int = 8) -> Optional[List[str]]:
+        """
+        按与 text 的字符二元组重合度挑选最相关的至多 limit 个工具名；
+        工具总数不超过 limit 或没有任何工具相关时返回 None，表示发送全部工具。
+        """
+        if len(self._tools) <= limit:
+            return None
+        grams = {text[i:i + 2] for i in range(len(text) - 1)}
+        scores = {name: len(grams & keywords) for name, keywords in self._keywords.items()}
+        ranked = [name for name in sorted(scores, key=scores.get, reverse=True) if scores[name] > 0]
+        return ranked[:limit] or None
+
+    def to_openai_tools(self, names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        tools 格式的 schema 列表（支持一轮多个工具调用），同样按注册表版本缓存。
+        """
+        key = ('tools', tuple(names) if names is not None else None)
+        tools = self._functions_cache.get(key)
+        if tools is None:
+            tools = [{"type": "function", "function": schema} for schema in self.to_openai_functions(names)]
+            self._functions_cache[key] = tools
+        return tools
+
+    def to_openai_functions(self, names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        返回（指定子集的）function schema 列表，按注册表版本缓存，调用方不应修改返回值。
+        """
+        key = tuple(names) if names is not None else None
+        functions = self._functions_cache.get(key)
+        if functions is None:
+            tools = self._tools.values() if names is None else [self._tools[n] for n in names if n in self._tools]
+            functions = [tool.to_openai_function() for tool in tools]
+            self._functions_cache[key] = functions
+        return functions
 
 # 全局工具注册表
-registry = ToolRegistry() 
\ No newline at end of file
+registry = ToolRegistry()
@@ -0,0 +1,139 @@
+import asyncio
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    return value
+
+class ResultCache:
+    """
+    工具结果缓存：以规范化后的调用参数为键，TTL 过期 + 容量上限 LRU 淘汰。
+    stale_ttl > 0 时，过期不超过 stale_ttl 秒的结果仍立即返回，同时在后台重新获取（stale-while-revalidate）。
+    返回 None 或抛出异常的调用不缓存。
+    """
+    def __init__(self, ttl: float, max_items: int = 128, stale_ttl: float = 0):
+        self.ttl = ttl
+        self.max_items = max_items
+        self.stale_ttl = stale_ttl
+        # key -> (写入时间, 结果)
+        self._entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {'hits': 0, 'stale_hits': 0, 'misses': 0}
+
+    @staticmethod
+    def key(signature: inspect.Signature, args: tuple, kwargs: dict) -> str:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return json.dumps(_normalize(bound.arguments), ensure_ascii=False, sort_keys=True, default=str)
+
+    def lookup(self, key: str) -> Tuple[bool, Any, bool]:
+        """
+        返回 (是否命中, 结果, 是否需要后台刷新)。
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = time.monotonic() - entry[0]
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return True, entry[1], False
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._stats['stale_hits'] += 1
+                    refresh = key not in self._refreshing
+                    self._refreshing.add(key)
+                    return True, entry[1], refresh
+                del self._entries[key]
+            self._stats['misses'] += 1
+            return False, None, False
+
+    def store(self, key: str, value: Any):
+        with self._lock:
+            self._refreshing.discard(key)
+            if value is None:
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def _refresh_failed(self, key: str, e: Exception):
+        with self._lock:
+            self._refreshing.discard(key)
+        print("工具结果后台刷新失败", e)
+
+    def wrap(self, func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        if inspect.iscoroutinefunction(func):
+            async def refresh_async(key, args, kwargs):
+                try:
+                    self.store(key, await func(*args, **kwargs))
+                except Exception as e:
+                    self._refresh_failed(key, e)
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = self.key(signature, args, kwargs)
+                hit, value, refresh = self.lookup(key)
+                if refresh:
+                    asyncio.get_running_loop().create_task(refresh_async(key, args, kwargs))
+                if hit:
+                    return value
+                value = await func(*args, **kwargs)
+                self.store(key, value)
+                return value
+            async_wrapper.cache = self
+            return async_wrapper
+
+        def refresh_sync(key, args, kwargs):
+            try:
+                self.store(key, func(*args, **kwargs))
+            except Exception as e:
+                self._refresh_failed(key, e)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = self.key(signature, args, kwargs)
+            hit, value, refresh = self.lookup(key)
+            if refresh:
+                threading.Thread(target=refresh_sync, args=(key, args, kwargs), daemon=True).start()
+            if hit:
+                return value
+            value = func(*args, **kwargs)
+            self.store(key, value)
+            return value
+        wrapper.cache = self
+        return wrapper
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        命中（含过期返回）、未命中次数与命中率。
+        """
+        with self._lock:
+            total = self._stats['hits'] + self._stats['stale_hits'] + self._stats['misses']
+            hits = self._stats['hits'] + self._stats['stale_hits']
+            return dict(self._stats, size=len(self._entries), hit_rate=hits / total if total else 0.0)
+
+def cached(ttl: float, max_items: int = 128, stale_ttl: float = 0) -> Callable[[Callable], Callable]:
+    """
+    缓存函数结果的装饰器，被装饰函数的 .cache 属性为对应的 ResultCache。
+    """
+    return ResultCache(ttl, max_items, stale_ttl).wrap
@@ -1,38 +1,125 @@
-from typing import Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import importlib
+import json
 import os
-from pathlib import Path
+import queue
+import re
+import threading
+import tempfile
 import time
-import asyncio
+from jarvis.audio import AudioInput, AudioPlayer, PRIORITY_SPEECH, get_audio_player
+from jarvis.core.aio import background_loop
+from .cache import SpeechCache
 
 class TTSEngine:
+    # 合成语音缓存，未设置时每次都重新合成
+    cache: Optional[SpeechCache] = None
+    # 播放器，未设置时使用进程内共享的播放器
+    player: Optional[AudioPlayer] = None
+
     def speak(self, text: str, **kwargs) -> None:
         raise NotImplementedError
 
+    def _play(self, audio: Optional[AudioInput]):
+        """
+        把内存中的音频以语音优先级排队播放，播放期间音乐自动闪避。
+        """
+        if audio is None:
+            return
+        (self.player or get_audio_player()).play(audio, PRIORITY_SPEECH, enqueue=True)
+
+    def _cached(self, key_parts: tuple, synthesize) -> Optional[bytes]:
+        """
+        命中缓存时直接返回缓存的音频数据，否则调用 synthesize() 合成并写入缓存。
+        """
+        if self.cache is None:
+            return None
+        key = SpeechCache.key(*key_parts)
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+        data = synthesize()
+        if data is not None:
+            self.cache.put(key, data)
+        return data
+
+    def prewarm(self, phrases: Iterable[str]) -> None:
+        """
+        预先合成固定话术，启动后首次播报即可命中缓存。尽力而为：单条失败（如离线）仅记录，不影响其余话术。
+        """
+        if self.cache is None:
+            return
+        for text in phrases:
+            try:
+                self.cached_audio(text)
+            except Exception as e:
+                print(f"预合成失败: {text[:20]}", e)
+
+    def cached_audio(self, text: str) -> Optional[bytes]:
+        """
+        以默认参数合成并缓存 text，返回音频数据；不支持缓存的引擎返回 None。
+        """
+        return None
+
+    def speak_stream(self, text: Union[str, Iterable[str]], **kwargs) -> None:
+        """
+        流式播报：text 可以是完整文本或逐步产出的文本增量（如 LLM 流式输出）。
+        支持的引擎按句合成并边合成边播放，默认等待全部文本后退化为 speak。
+        """
+        self.speak(text if isinstance(text, str) else ''.join(text), **kwargs)
+
+_SENTENCE_END = re.compile(r'(?<=[。！？!?；;，,、\n])')
+
+def iter_sentences(chunks: Iterable[str], min_length: int = 8) -> Iterator[str]:
+    """
+    从逐步到达的文本增量中切分出完整的句子，每凑满一句立即产出。
+    首句尽量短以便尽快出声，之后的过短片段与下一片段合并。
+    """
+    buffer = ''
+    pending = ''
+    first = True
+    for chunk in chunks:
+        buffer += chunk
+        *pieces, buffer = _SENTENCE_END.split(buffer)
+        for piece in pieces:
+            if not piece.strip():
+                continue
+            pending += piece
+            if first or len(pending) >= min_length:
+                yield pending
+                pending = ''
+                first = False
+    pending += buffer
+    if pending.strip():
+        yield pending
+
+def split_sentences(text: str, min_length: int = 8) -> List[str]:
+    return list(iter_sentences([text], min_length))
+
 class BaiduTTS(TTSEngine):
     def __init__(self, app_id, api_key, secret_key):
         aip = importlib.import_module('aip')
         self.client = aip.AipSpeech(app_id, api_key, secret_key)
 
-    def speak(self, text: str = "", speed: int = 5, volume: int = 5, person: int = 3):
+    def synthesize(self, text: str, speed: int = 5, volume: int = 5, person: int = 3) -> Optional[bytes]:
         result = self.client.synthesis(text, 'zh', 1, {
             'spd': speed,
             'vol': volume,
             'per': person
         })
-        filePath = os.path.join(Path.home(), "audio.mp3")
-        if not isinstance(result, dict):
-            with open(filePath, "wb") as f:
-                f.write(result)
-            self._play(filePath)
-        else:
+        if isinstance(result, dict):
             print("语音合成失败", result)
+            return None
+        return result
+
+    def cached_audio(self, text: str, speed: int = 5, volume: int = 5, person: int = 3) -> Optional[bytes]:
+        return self._cached(('baidu', person, speed, volume, text), lambda: self.synthesize(text, speed, volume, person))
 
-    def _play(self, filePath):
-        import threading
-        from playsound import playsound
-        t = threading.Thread(target=playsound, args=(filePath,))
-        t.start()
+    def speak(self, text: str = "", speed: int = 5, volume: int = 5, person: int = 3):
+        if self.cache is not None:
+            self._play(self.cached_audio(text, speed, volume, person))
+        else:
+            self._play(self.synthesize(text, speed, volume, person))
 
 class Pyttsx3TTS(TTSEngine):
     def __init__(self):
@@ -54,37 +141,166 @@ class PaddleSpeechTTS(TTSEngine):
         paddlespeech = importlib.import_module('paddlespeech.cli.tts.infer')
         self.executor = paddlespeech.TTSExecutor()
 
-    def speak(self, text: str = "", lang: str = 'mix', model: str = 'fastspeech2_male'):
-        filePath = os.path.join(Path.home(), "output.mp3")
-        self.executor(text=text, output=filePath, am=model, lang=lang)
-        self._play(filePath)
+    def synthesize(self, text: str, lang: str = 'mix', model: str = 'fastspeech2_male') -> bytes:
+        # TTSExecutor 只能输出到文件，借助临时文件取回音频数据
+        fd, filePath = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            self.executor(text=text, output=filePath, am=model, lang=lang)
+            with open(filePath, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(filePath)
+
+    def cached_audio(self, text: str, lang: str = 'mix', model: str = 'fastspeech2_male') -> Optional[bytes]:
+        return self._cached(('paddlespeech', model, lang, '', text), lambda: self.synthesize(text, lang, model))
 
-    def _play(self, filePath):
-        import threading
-        from playsound import playsound
-        t = threading.Thread(target=playsound, args=(filePath,))
-        t.start()
+    def speak(self, text: str = "", lang: str = 'mix', model: str = 'fastspeech2_male'):
+        if self.cache is not None:
+            self._play(self.cached_audio(text, lang, model))
+        else:
+            self._play(self.synthesize(text, lang, model))
 
 class EdgeTTS(TTSEngine):
-    def __init__(self):
+    rate = "-5%"
+    volume = "+10%"
+
+    def __init__(self, player: Optional[AudioPlayer] = None, voices_file: Optional[str] = None,
+                 voices_ttl: float = 7 * 24 * 3600):
         self.edge_tts = importlib.import_module('edge_tts')
+        # 流式播报时直接把内存中的音频块交给播放器
+        self.player = player
+        self.voices_file = voices_file
+        self.voices_ttl = voices_ttl
+        self._voices = None
+        self._voice_names: Dict[Tuple[str, str], str] = {}
+        self._voices_lock = threading.Lock()
 
-    def speak(self, text: str = "", lang: str = 'zh-CN', voice: Optional[str] = None):
-        loop = asyncio.get_event_loop()
-        voices = loop.run_until_complete(self.edge_tts.VoicesManager.create())
-        if voice is None:
-            voice_list = voices.find(Gender="Male", Locale=lang)
+    def _load_voice_list(self) -> list:
+        """
+        读取磁盘缓存的音色目录，过期或不存在时重新拉取并写回；拉取失败时退回过期的缓存。
+        """
+        cached = None
+        if self.voices_file and os.path.exists(self.voices_file):
+            with open(self.voices_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if time.time() - os.path.getmtime(self.voices_file) < self.voices_ttl:
+                return cached
+        try:
+            voices = background_loop.run(self.edge_tts.list_voices())
+        except Exception as e:
+            if cached is None:
+                raise
+            print("音色列表更新失败，使用过期缓存", e)
+            return cached
+        if self.voices_file:
+            os.makedirs(os.path.dirname(self.voices_file), exist_ok=True)
+            tmp_path = f'{self.voices_file}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(voices, f, ensure_ascii=False)
+            os.replace(tmp_path, self.voices_file)
+        return voices
+
+    def _resolve_voice(self, lang: str, voice: Optional[str], gender: str = "Male") -> str:
+        if voice is not None:
+            return voice
+        name = self._voice_names.get((lang, gender))
+        if name is not None:
+            return name
+        with self._voices_lock:
+            if self._voices is None:
+                self._voices = background_loop.run(self.edge_tts.VoicesManager.create(self._load_voice_list()))
+            voice_list = self._voices.find(Gender=gender, Locale=lang)
             if not voice_list:
-                voice_list = voices.find(Gender="Male", Locale='zh-CN')
-            voice = voice_list[0]["Name"]
-        communicate = self.edge_tts.Communicate(text, voice, rate="-5%", volume="+10%")
-        timestamp = time.strftime('%Y%m%d%H%M%S', time.localtime(time.time()))
-        filePath = os.path.join(Path.home(), f"record_{timestamp}.mp3")
-        loop.run_until_complete(communicate.save(filePath))
-        self._play(filePath)
-
-    def _play(self, filePath):
-        import threading
-        from playsound import playsound
-        t = threading.Thread(target=playsound, args=(filePath,))
-        t.start() 
\ No newline at end of file
+                voice_list = self._voices.find(Gender=gender, Locale='zh-CN')
+            name = voice_list[0]["Name"]
+            self._voice_names[(lang, gender)] = name
+        return name
+
+    def synthesize(self, text: str, voice: str) -> bytes:
+        async def run():
+            communicate = self.edge_tts.Communicate(text, voice, rate=self.rate, volume=self.volume)
+            chunks = []
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    chunks.append(chunk["data"])
+            return b''.join(chunks)
+        return background_loop.run(run())
+
+    def cached_audio(self, text: str, lang: str = 'zh-CN', voice: Optional[str] = None) -> Optional[bytes]:
+        voice = self._resolve_voice(lang, voice)
+        return self._cached(('edge', voice, self.rate, self.volume, text), lambda: self.synthesize(text, voice))
+
+    def stream_audio(self, text: Union[str, Iterable[str]], lang: str = 'zh-CN', voice: Optional[str] = None,
+                     lookahead: int = 2) -> Iterator[bytes]:
+        """
+        按句流水线合成：当前句边合成边产出音频块，同时提前合成后续 lookahead 句。
+        text 为文本增量迭代器时，由调度线程逐句读取，首句到达即开始合成。
+        命中缓存的句子直接产出，未命中的合成完成后写入缓存。
+        """
+        voice = self._resolve_voice(lang, voice)
+        sentences = iter_sentences([text] if isinstance(text, str) else text)
+        # 按句子顺序排列的音频块队列，None 表示没有更多句子
+        queues = queue.Queue()
+        slots = threading.Semaphore(lookahead + 1)
+        closed = threading.Event()
+        futures = []
+
+        async def produce(sentence: str, q: queue.Queue):
+            key = SpeechCache.key('edge', voice, self.rate, self.volume, sentence)
+            try:
+                data = self.cache.get(key) if self.cache is not None else None
+                if data is not None:
+                    q.put(data)
+                    return
+                communicate = self.edge_tts.Communicate(sentence, voice, rate=self.rate, volume=self.volume)
+                chunks = []
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        chunks.append(chunk["data"])
+                        q.put(chunk["data"])
+                if self.cache is not None and chunks:
+                    self.cache.put(key, b''.join(chunks))
+            finally:
+                q.put(None)
+
+        def schedule():
+            try:
+                for sentence in sentences:
+                    slots.acquire()
+                    if closed.is_set():
+                        break
+                    q = queue.Queue()
+                    futures.append(background_loop.submit(produce(sentence, q)))
+                    queues.put(q)
+            except Exception as e:
+                print("流式文本读取失败", e)
+            finally:
+                queues.put(None)
+
+        threading.Thread(target=schedule, name='jarvis-tts-stream', daemon=True).start()
+        try:
+            while True:
+                q = queues.get()
+                if q is None:
+                    break
+                while True:
+                    data = q.get()
+                    if data is None:
+                        break
+                    yield data
+                slots.release()
+        finally:
+            closed.set()
+            slots.release()
+            for future in list(futures):
+                future.cancel()
+
+    def speak_stream(self, text: Union[str, Iterable[str]] = "", lang: str = 'zh-CN', voice: Optional[str] = None):
+        self._play(self.stream_audio(text, lang, voice))
+
+    def speak(self, text: str = "", lang: str = 'zh-CN', voice: Optional[str] = None):
+        if self.cache is not None:
+            self._play(self.cached_audio(text, lang, voice))
+        else:
+            self._play(self.synthesize(text, self._resolve_voice(lang, voice)))
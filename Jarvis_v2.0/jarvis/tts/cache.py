@@ -0,0 +1,85 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+class SpeechCache:
+    """
+    合成语音缓存：以 (引擎, 音色, 语速, 音量, 文本) 的哈希为键，内存 LRU + 磁盘两级存储。
+    磁盘总大小超过上限时按最近访问时间淘汰最旧的文件。
+    """
+    def __init__(self, directory: str, memory_items: int = 64, max_disk_bytes: int = 200 * 1024 * 1024):
+        self.directory = directory
+        self.memory_items = memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._disk_bytes = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(engine: str, voice, rate, volume, text: str) -> str:
+        raw = '\x1f'.join(str(part) for part in (engine, voice, rate, volume, text))
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.mp3')
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+        file_path = self.path(key)
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            # 更新访问时间，供磁盘淘汰使用
+            os.utime(file_path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> str:
+        file_path = self.path(key)
+        tmp_path = f'{file_path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        existed = os.path.exists(file_path)
+        os.replace(tmp_path, file_path)
+        with self._lock:
+            self._remember(key, data)
+            if not existed:
+                self._disk_bytes += len(data)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict(keep=file_path)
+        return file_path
+
+    def _remember(self, key: str, data: bytes):
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self, keep: str):
+        entries = sorted((entry for entry in os.scandir(self.directory) if entry.is_file() and entry.name.endswith('.mp3')),
+                         key=lambda entry: entry.stat().st_mtime)
+        for entry in entries:
+            if self._disk_bytes <= self.max_disk_bytes * 0.9:
+                break
+            if entry.path == keep:
+                continue
+            size = entry.stat().st_size
+            os.remove(entry.path)
+            self._disk_bytes -= size
+            self._memory.pop(entry.name[:-len('.mp3')], None)
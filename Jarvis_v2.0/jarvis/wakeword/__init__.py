@@ -1,18 +1,50 @@
-from typing import Optional
+from typing import Iterator, Optional
+import ctypes
+import time
+import numpy as np
 import pvporcupine
 import pyaudio
-import struct
+from jarvis.audio.capture import MicrophoneCapture
 
 class WakeWordEngine:
     def detect(self) -> Optional[int]:
         raise NotImplementedError
 
+    def detect_loop(self) -> Iterator[int]:
+        """
+        阻塞式检测循环，仅在检测到唤醒词时产出关键词下标。
+        """
+        while True:
+            keyword_idx = self.detect()
+            if keyword_idx is not None and keyword_idx >= 0:
+                yield keyword_idx
+
+    def reset(self) -> None:
+        pass
+
 class PicovoiceWakeWord(WakeWordEngine):
-    def __init__(self, access_key: str, keyword_path: str, input_device_index: int = 0):
+    def __init__(self, access_key: str, keyword_path: str, input_device_index: int = 0, capture: Optional[MicrophoneCapture] = None):
         self.porcupine = pvporcupine.create(
             access_key=access_key,
             keyword_paths=[keyword_path]
         )
+        frame_length = self.porcupine.frame_length
+        # 预分配的 ctypes 帧缓冲区及其 int16 视图，每帧复用，不再逐帧构造元组
+        self._pcm = (ctypes.c_short * frame_length)()
+        self._pcm_view = np.frombuffer(self._pcm, dtype=np.int16)
+        self._result = ctypes.c_int()
+        # Porcupine.process 内部仍会逐个拷贝样本，可用时直接把缓冲区指针交给底层函数
+        self._process_func = getattr(self.porcupine, '_process_func', None)
+        self._handle = getattr(self.porcupine, '_handle', None)
+        # 每帧 CPU 耗时统计
+        self.frames_processed = 0
+        self.cpu_time_ns = 0
+        self.capture = capture
+        if capture is not None:
+            # 与 ASR 共享同一采集流，只维护自己的读游标
+            assert capture.sample_rate == self.porcupine.sample_rate and capture.frame_length == frame_length
+            self._cursor = capture.cursor
+            return
         self.myaudio = pyaudio.PyAudio()
         self.stream = self.myaudio.open(
             input_device_index=input_device_index,
@@ -20,14 +52,47 @@ class PicovoiceWakeWord(WakeWordEngine):
             channels=1,
             format=pyaudio.paInt16,
             input=True,
-            frames_per_buffer=self.porcupine.frame_length
+            frames_per_buffer=frame_length
         )
 
     def detect(self) -> Optional[int]:
-        audio_obj = self.stream.read(self.porcupine.frame_length, exception_on_overflow=False)
-        audio_obj_unpacked = struct.unpack_from("h" * self.porcupine.frame_length, audio_obj)
-        keyword_idx = self.porcupine.process(audio_obj_unpacked)
-        return keyword_idx 
-    
+        if self.capture is not None:
+            ok, self._cursor = self.capture.read_into(self._cursor, self._pcm_view, timeout=1.0)
+            if not ok:
+                return None
+        else:
+            audio_obj = self.stream.read(self.porcupine.frame_length, exception_on_overflow=False)
+            ctypes.memmove(self._pcm, audio_obj, ctypes.sizeof(self._pcm))
+        return self.process_buffer()
+
+    def process_buffer(self) -> int:
+        """
+        对预分配缓冲区中的当前帧执行检测，并累计 CPU 耗时。
+        """
+        started = time.thread_time_ns()
+        try:
+            if self._process_func is not None:
+                status = self._process_func(self._handle, self._pcm, ctypes.byref(self._result))
+                if status == self.porcupine.PicovoiceStatuses.SUCCESS:
+                    return self._result.value
+            # 回退到公开接口，同时由其抛出具体的错误
+            return self.porcupine.process(self._pcm_view)
+        finally:
+            self.cpu_time_ns += time.thread_time_ns() - started
+            self.frames_processed += 1
+
+    @property
+    def avg_frame_cost_ms(self) -> float:
+        if not self.frames_processed:
+            return 0.0
+        return self.cpu_time_ns / self.frames_processed / 1e6
+
+    def reset(self) -> None:
+        """
+        丢弃尚未检测的共享音频（例如刚被 ASR 消费的语句），从当前时刻继续检测。
+        """
+        if self.capture is not None:
+            self._cursor = self.capture.cursor
+
 if __name__ == '__main__':
     wakeword = PicovoiceWakeWord(settings.PICOVOICE_API_KEY, 'Jarvis_en_windows_v2_1_0.ppn')
\ No newline at end of file
@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, List
+
+# Sherpa 模型在进程内共享且解码时加锁，多个工作线程只会排队，无法提高吞吐
+SERIAL_ENGINES = ('sherpa',)
+
+def iter_inputs(paths: List[str]) -> Iterator[str]:
+    """
+    展开输入：目录递归查找 .wav，.txt/.jsonl 清单逐行读取路径（jsonl 取 file 字段），其余视为单个文件。
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith('.wav'):
+                        yield os.path.join(root, name)
+        elif path.endswith('.txt') or path.endswith('.jsonl'):
+            base = os.path.dirname(path)
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    file_name = json.loads(line)['file'] if path.endswith('.jsonl') else line
+                    yield file_name if os.path.isabs(file_name) else os.path.join(base, file_name)
+        else:
+            yield path
+
+def batched(items: Iterator[str], size: int) -> Iterator[List[str]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def per_worker_engine(name: str) -> Callable:
+    """
+    每个工作线程首次调用时创建自己的引擎：Whisper、PaddleSpeech 等模型不是线程安全的，不能跨线程共享。
+    """
+    from jarvis.asr.factory import create_asr_engine
+    local = threading.local()
+
+    def get_engine():
+        engine = getattr(local, 'engine', None)
+        if engine is None:
+            engine = local.engine = create_asr_engine(name)
+        return engine
+    return get_engine
+
+def transcribe_batch(engine, files: List[str]) -> List[dict]:
+    from jarvis.asr import load_wav
+    records = []
+    loaded = []
+    for file_name in files:
+        try:
+            loaded.append((file_name, load_wav(file_name, engine.sample_rate)))
+        except Exception as e:
+            records.append({'file': file_name, 'error': str(e)})
+    if not loaded:
+        return records
+    started = time.monotonic()
+    try:
+        texts = engine.transcribe_batch([samples for _, samples in loaded])
+    except Exception as e:
+        return records + [{'file': file_name, 'error': str(e)} for file_name, _ in loaded]
+    # 批内耗时按音频时长分摊到各文件
+    elapsed = time.monotonic() - started
+    total_duration = sum(samples.size for _, samples in loaded) / engine.sample_rate or 1.0
+    for (file_name, samples), text in zip(loaded, texts):
+        duration = samples.size / engine.sample_rate
+        file_elapsed = elapsed * duration / total_duration
+        records.append({
+            'file': file_name,
+            'text': text,
+            'duration': round(duration, 3),
+            'elapsed': round(file_elapsed, 3),
+            'rtf': round(file_elapsed / duration, 4) if duration else None
+        })
+    return records
+
+def main(argv: List[str] = None):
+    """
+    离线批量转写：对目录或清单中的 WAV 文件逐个识别，结果以 JSONL 流式输出。
+    """
+    parser = argparse.ArgumentParser(prog='jarvis transcribe', description='使用指定 ASR 引擎批量转写 WAV 文件')
+    parser.add_argument('inputs', nargs='+', help='WAV 文件、目录，或 .txt/.jsonl 清单')
+    parser.add_argument('--engine', default='whisper', choices=['baidu', 'paddlespeech', 'whisper', 'sherpa', 'hedged'])
+    parser.add_argument('--workers', type=int, default=2, help='并发工作线程数，每个线程加载一份独立的模型')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='每个任务处理的文件数；目前各引擎仍逐条识别，仅用于分组，不会合并推理')
+    parser.add_argument('--output', default='-', help='JSONL 输出文件，默认标准输出')
+    args = parser.parse_args(argv)
+
+    workers = max(1, args.workers)
+    if args.engine in SERIAL_ENGINES and workers > 1:
+        print(f'{args.engine} 引擎解码串行执行，--workers 按 1 处理', file=sys.stderr)
+        workers = 1
+    get_engine = per_worker_engine(args.engine)
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    started = time.monotonic()
+    total_files = 0
+    total_duration = 0.0
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(lambda batch: transcribe_batch(get_engine(), batch), batch)
+                       for batch in batched(iter_inputs(args.inputs), args.batch_size)]
+            for future in as_completed(futures):
+                for record in future.result():
+                    total_files += 1
+                    total_duration += record.get('duration', 0.0)
+                    output.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    wall = time.monotonic() - started
+    print(f'共转写 {total_files} 个文件，音频 {total_duration:.1f}s，耗时 {wall:.1f}s，'
+          f'吞吐 {total_duration / wall if wall else 0:.2f}x 实时', file=sys.stderr)
+
+if __name__ == "__main__":
+    main()